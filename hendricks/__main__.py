@@ -21,9 +21,36 @@ from quantum_trade_utilities.io.logging_config import (
 from hendricks.ingest_quotes.load_quote_data import DataLoader  # pylint: disable=C0413
 from hendricks.ingest_fmpEPs.load_fmp_data import FinLoader  # pylint: disable=C0413
 from hendricks.ingest_news.load_news_data import NewsLoader  # pylint: disable=C0413
+from hendricks.ingest_news.content_policy import (
+    ContentPolicy,
+)  # pylint: disable=C0413
+from hendricks.ingest_news.news_storage import (
+    gc_news_content,
+)  # pylint: disable=C0413
+from hendricks.ingest_news.storage_mode import (
+    StorageMode,
+)  # pylint: disable=C0413
+from hendricks.ingest_social.comment_storage import (
+    CommentStorage,
+)  # pylint: disable=C0413
 from hendricks.ingest_social.load_social_data import (
     SocialLoader,
 )  # pylint: disable=C0413
+from hendricks.ingest_social.social_stream_from_reddit import (
+    stop_social_streams,
+)  # pylint: disable=C0413
+from hendricks.stream_quotes.stream_wal import (
+    close_open_wals,
+)  # pylint: disable=C0413
+from hendricks.stream_quotes.stream_metrics import (
+    stream_metrics_snapshot,
+)  # pylint: disable=C0413
+from hendricks.stream_quotes.stream_manager import (
+    stream_manager,
+)  # pylint: disable=C0413
+from hendricks.stream_quotes.snapshot_cache import (
+    snapshot_cache,
+)  # pylint: disable=C0413
 
 dotenv.load_dotenv(get_path("env"))
 
@@ -33,7 +60,10 @@ app = Flask(__name__)
 def handle_sigterm(*args):
     """Handle SIGTERM signal."""
     print("Received SIGTERM, shutting down gracefully...")
-    # Perform any cleanup here
+    # Stop managed streams, then flush and checkpoint any remaining WALs
+    stream_manager.stop_all()
+    stop_social_streams()
+    close_open_wals()
     sys.exit(0)
 
 
@@ -180,6 +210,8 @@ def load_fin_data():
 
     # Daily flag is for processing daily data by day
     daily_fmp_flag = data.get("daily_fmp_flag")
+    # Monthly windows loaded in parallel under the shared FMP rate limit
+    max_workers = data.get("max_workers", 4)
 
     logging.info(f"Tickers: {tickers}")
     logging.info(f"From date: {from_date}")
@@ -214,6 +246,7 @@ def load_fin_data():
                     source=source,
                     fmp_endpoint=fmp_endpoint,
                     mongo_db=mongo_db,
+                    max_workers=max_workers,
                 )
                 # * USING FROM_DATE TO CONTROL DAILY LOADING
                 if daily_fmp_flag:
@@ -259,11 +292,28 @@ def load_news():
         collection_name = "rawNewsColl"
     sources = data.get("sources")
     gridfs_bucket = data.get("gridfs_bucket")
+    # 'provider_first' (default), 'scrape' or 'never'
+    content_policy = data.get("content_policy")
+    # Compressed bodies up to this many bytes are stored inline, not in GridFS
+    inline_max_bytes = data.get("inline_max_bytes")
+    # 'per_ticker' (default) or 'article' for one document per article
+    storage_mode = data.get("storage_mode")
+    # Date windows loaded in parallel under the provider's rate limit
+    max_workers = data.get("max_workers", 4)
+    # FMP only: tickers requested per call, results are split back out by symbol
+    ticker_batch_size = data.get("ticker_batch_size")
+    # e.g. 0.8 to link syndicated copies to one canonical article
+    near_duplicate_threshold = data.get("near_duplicate_threshold")
 
     if not tickers:
         return jsonify({"error": "Ticker symbol is required"}), 400
     if not sources:
         return jsonify({"error": "Source are required"}), 400
+    try:
+        ContentPolicy.get_by_name(content_policy)
+        StorageMode.get_by_name(storage_mode)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     failed_sources = []
     successful_sources = []
@@ -278,6 +328,12 @@ def load_news():
                 source=source,
                 gridfs_bucket=gridfs_bucket,
                 mongo_db=mongo_db,
+                content_policy=content_policy,
+                inline_max_bytes=inline_max_bytes,
+                storage_mode=storage_mode,
+                max_workers=max_workers,
+                ticker_batch_size=ticker_batch_size,
+                near_duplicate_threshold=near_duplicate_threshold,
             )
             loader.load_news_data()
             successful_sources.append(source)
@@ -299,6 +355,54 @@ def load_news():
     )
 
 
+@app.route("/hendricks/gc_news_content", methods=["POST"])
+@requires_api_key
+def gc_news_content_endpoint():
+    """Endpoint to delete GridFS article bodies no news document references."""
+    data = request.json or {}
+    logging.info(f"Received data: {data}")
+
+    collection_names = data.get("collection_names")
+    gridfs_bucket = data.get("gridfs_bucket")
+    mongo_db = data.get("mongo_db")
+    dry_run = bool(data.get("dry_run", False))
+    allow_default_bucket = bool(data.get("allow_default_bucket", False))
+
+    if not collection_names:
+        return (
+            jsonify({"error": "Every collection referencing the bucket is required"}),
+            400,
+        )
+    if mongo_db is None:
+        mongo_db = "stocksDB"
+
+    try:
+        result = gc_news_content(
+            collection_names=collection_names,
+            gridfs_bucket=gridfs_bucket,
+            mongo_db=mongo_db,
+            dry_run=dry_run,
+            allow_default_bucket=allow_default_bucket,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error sweeping news content: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    return (
+        jsonify(
+            {
+                "status": "completed",
+                "dry_run": dry_run,
+                "collections": collection_names,
+                **result,
+            }
+        ),
+        200,
+    )
+
+
 @app.route("/hendricks/load_social", methods=["POST"])
 @requires_api_key
 def load_social():
@@ -313,10 +417,20 @@ def load_social():
     # Social-specific parameters
     sources = data.get("sources")  # Default to reddit
     subreddits = data.get("subreddits")
-    reddit_load = data.get("reddit_load")  # Default to recent mode
+    reddit_load = data.get("reddit_load")  # Default to recent mode, 'live' streams
     comment_depth = data.get("comment_depth", 100)
     keywords = data.get("keywords", {})  # New parameter for keyword mappings
     target_endpoint = data.get("target_endpoint")
+    # False re-crawls every listing from scratch instead of stopping at the watermark
+    use_watermarks = data.get("use_watermarks", True)
+    # 'search' runs per-ticker searches, 'scan' reads each subreddit once and tags mentions
+    crawl_mode = data.get("crawl_mode", "search")
+    # Operations per bulk_write to the posts and comments collections
+    write_batch_size = data.get("write_batch_size", 1000)
+    # Tickers (search) or subreddits (scan) crawled at once under one rate limiter
+    max_workers = data.get("max_workers", 1)
+    # 'documents' (default) or 'threads' for bucketed per-post thread documents
+    comment_storage = data.get("comment_storage")
 
     # Set default collection name if none provided
     if collection_name is None:
@@ -326,6 +440,10 @@ def load_social():
         return jsonify({"error": "Ticker symbol is required"}), 400
     if not sources:
         return jsonify({"error": "Social source endpoint is required"}), 400
+    try:
+        CommentStorage.get_by_name(comment_storage)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     # Send immediate response that processing has started
     response = {
@@ -348,6 +466,11 @@ def load_social():
                 comment_depth=comment_depth,
                 keywords=keywords,
                 target_endpoint=target_endpoint,
+                use_watermarks=use_watermarks,
+                crawl_mode=crawl_mode,
+                write_batch_size=write_batch_size,
+                max_workers=max_workers,
+                comment_storage=comment_storage,
             )
             loader.load_data()
             logging.info(f"Successfully processed source: {source}")
@@ -362,5 +485,125 @@ def load_social():
     )  # 202 Accepted indicates the request is being processed
 
 
+@app.route("/hendricks/stream_metrics", methods=["GET"])
+@requires_api_key
+def stream_metrics():
+    """Endpoint to report latency and throughput of running quote streams."""
+    return jsonify({"status": "ok", "streams": stream_metrics_snapshot()}), 200
+
+
+@app.route("/hendricks/stream_start", methods=["POST"])
+@requires_api_key
+def stream_start():
+    """Endpoint to start a trade stream managed by the service."""
+    data = request.json
+    logging.info(f"Received data: {data}")
+
+    tickers = data.get("tickers")
+    collection_name = data.get("collection_name")
+    mongo_db = data.get("mongo_db")
+    name = data.get("name")
+
+    if collection_name is None:
+        collection_name = "rawPriceColl"
+    if mongo_db is None:
+        mongo_db = "stocksDB"
+    if name is None:
+        name = collection_name
+
+    if not tickers:
+        return jsonify({"error": "Ticker symbol is required"}), 400
+
+    try:
+        status = stream_manager.start(
+            name=name,
+            tickers=tickers,
+            collection_name=collection_name,
+            mongo_db=mongo_db,
+        )
+    except (ValueError, RuntimeError) as e:
+        # Already running, or its WAL is still held by a stream that hasn't exited
+        return jsonify({"error": str(e)}), 409
+
+    return jsonify({"status": "started", "stream": status}), 202
+
+
+@app.route("/hendricks/stream_symbols", methods=["POST"])
+@requires_api_key
+def stream_symbols():
+    """Endpoint to add or remove symbols on a running stream."""
+    data = request.json
+    logging.info(f"Received data: {data}")
+
+    name = data.get("name")
+    add = data.get("add") or []
+    remove = data.get("remove") or []
+
+    if not name:
+        return jsonify({"error": "Stream name is required"}), 400
+    if not add and not remove:
+        return jsonify({"error": "Symbols to add or remove are required"}), 400
+
+    try:
+        if add:
+            status = stream_manager.add_symbols(name, add)
+        if remove:
+            status = stream_manager.remove_symbols(name, remove)
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    except TimeoutError:
+        return jsonify({"error": f"Stream {name} did not respond in time"}), 503
+
+    return jsonify({"status": "updated", "stream": status}), 200
+
+
+@app.route("/hendricks/stream_stop", methods=["POST"])
+@requires_api_key
+def stream_stop():
+    """Endpoint to stop a managed stream."""
+    data = request.json
+    logging.info(f"Received data: {data}")
+
+    name = data.get("name")
+    if not name:
+        return jsonify({"error": "Stream name is required"}), 400
+
+    try:
+        status = stream_manager.stop(name)
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+
+    return jsonify({"status": "stopped", "stream": status}), 200
+
+
+@app.route("/hendricks/stream_status", methods=["GET"])
+@requires_api_key
+def stream_status():
+    """Endpoint to report the state of managed streams."""
+    name = request.args.get("name")
+
+    try:
+        streams = stream_manager.status(name)
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+
+    return jsonify({"status": "ok", "streams": streams}), 200
+
+
+@app.route("/hendricks/stream_snapshot", methods=["GET"])
+@requires_api_key
+def stream_snapshot():
+    """Endpoint to read the latest trade and bar per symbol from memory."""
+    tickers = request.args.get("tickers")
+    tickers = [t.strip() for t in tickers.split(",") if t.strip()] if tickers else None
+
+    snapshots = snapshot_cache.get(tickers)
+    missing = [t for t in tickers if t not in snapshots] if tickers else []
+
+    return jsonify({"status": "ok", "snapshots": snapshots, "missing": missing}), 200
+
+
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=8711)
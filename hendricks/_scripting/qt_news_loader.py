@@ -15,6 +15,7 @@ COLLECTION_NAME = "rawNewsColl"
 TICKERS = "AAPL"  # Default ticker
 ARTICLES_LIMIT = 5000
 NEWS_SOURCES = "alpaca"
+CONTENT_POLICY = "provider_first"
 
 # Check if API key is set
 QT_HENDRICKS_API_KEY = os.getenv("QT_HENDRICKS_API_KEY")
@@ -39,6 +40,11 @@ def show_help():
     print("  -c    Collection name (default: {})".format(COLLECTION_NAME))
     print("  -a    Articles limit (default: {})".format(ARTICLES_LIMIT))
     print("  -o    Source (default: {})".format(NEWS_SOURCES))
+    print(
+        "  -p    Content policy: provider_first, scrape or never (default: {})".format(
+            CONTENT_POLICY
+        )
+    )
     print("  -h    Show this help message")
 
 
@@ -86,6 +92,13 @@ parser.add_argument(
     default=NEWS_SOURCES,
     help="News source list (default: {})".format(NEWS_SOURCES),
 )
+parser.add_argument(
+    "-p",
+    "--content_policy",
+    type=str,
+    default=CONTENT_POLICY,
+    help="Content policy (default: {})".format(CONTENT_POLICY),
+)
 args = parser.parse_args()
 
 # Check if ticker symbols are provided
@@ -112,6 +125,7 @@ data = {
     "collection_name": args.collection_name,
     "articles_limit": args.articles_limit,
     "sources": sources_list,
+    "content_policy": args.content_policy,
 }
 
 # Define the headers
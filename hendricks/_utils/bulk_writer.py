@@ -0,0 +1,160 @@
+"""
+Buffered, thread-safe bulk writes to a MongoDB collection.
+"""
+
+import time
+import logging
+import threading
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+
+class BufferedBulkWriter:
+    """
+    Collect write operations and send them in large unordered bulk_writes.
+
+    The buffer is flushed when it reaches ``batch_size`` operations, when
+    ``flush_interval`` seconds have passed since the last flush (checked on
+    every add and by ``maybe_flush``), and on ``close``. Used as a context
+    manager it also flushes when the block raises. Duplicate key errors are
+    ignored like everywhere else in the loaders. Batches are unordered
+    unless ``ordered`` is set, for operations that build on each other.
+
+    ``before_flush`` runs ahead of every flush, e.g. to write a child
+    collection first, and ``on_flush`` after it, e.g. to commit crawl
+    watermarks once everything they cover is stored.
+
+    An ordered batch stops at its first error, so ordered writers log every
+    failed write, duplicate keys included. ``on_write_error`` is called with
+    the batch and the BulkWriteError, e.g. to drop state that assumed the
+    skipped operations were applied.
+    """
+
+    def __init__(
+        self,
+        collection,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        before_flush=None,
+        on_flush=None,
+        on_write_error=None,
+        ordered: bool = False,
+        verbose: bool = False,
+    ):
+        self.collection = collection
+        self.batch_size = max(1, int(batch_size or DEFAULT_BATCH_SIZE))
+        self.flush_interval = flush_interval
+        self.before_flush = before_flush
+        self.on_flush = on_flush
+        self.on_write_error = on_write_error
+        self.ordered = ordered
+        self.verbose = verbose
+        self.written = 0
+        self.upserted = 0
+        self.modified = 0
+        self.round_trips = 0
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def add(self, operation):
+        """Buffer one operation, flushing if the batch is full or stale."""
+        self.extend([operation])
+
+    def extend(self, operations):
+        """Buffer several operations, flushing if the batch is full or stale."""
+        with self._lock:
+            self._buffer.extend(operations)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+            else:
+                self.maybe_flush()
+
+    def discard(self, predicate) -> int:
+        """Drop buffered operations matching ``predicate``; returns how many."""
+        with self._lock:
+            kept = [operation for operation in self._buffer if not predicate(operation)]
+            dropped = len(self._buffer) - len(kept)
+            self._buffer[:] = kept
+        return dropped
+
+    def maybe_flush(self):
+        """Flush if ``flush_interval`` has elapsed since the last flush."""
+        with self._lock:
+            if (
+                self.flush_interval is not None
+                and time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self.flush()
+
+    def flush(self):
+        """Write everything buffered in batch_size chunks."""
+        with self._lock:
+            if self.before_flush is not None:
+                self.before_flush()
+            while self._buffer:
+                batch = self._buffer[: self.batch_size]
+                del self._buffer[: self.batch_size]
+                self._write(batch)
+            self._last_flush = time.monotonic()
+            if self.on_flush is not None:
+                self.on_flush()
+
+    def _write(self, batch: list):
+        self.round_trips += 1
+        self.written += len(batch)
+        try:
+            result = self.collection.bulk_write(batch, ordered=self.ordered)
+            self.upserted += result.upserted_count
+            self.modified += result.modified_count
+            if self.verbose:
+                logger.info(
+                    f"Bulk write results - "
+                    f"Inserted: {result.upserted_count}, "
+                    f"Modified: {result.modified_count}"
+                )
+        except BulkWriteError as bwe:
+            self.upserted += bwe.details.get("nUpserted", 0)
+            self.modified += bwe.details.get("nModified", 0)
+            if self.ordered:
+                # Everything after the first error was skipped, not just it
+                errors = bwe.details["writeErrors"]
+                logger.warning(
+                    f"Ordered write to {self.collection.name} stopped at "
+                    f"operation {errors[0]['index']} of {len(batch)}: {errors}"
+                )
+            else:
+                # Filter out duplicate key errors (code 11000)
+                non_duplicate_errors = [
+                    error
+                    for error in bwe.details["writeErrors"]
+                    if error["code"] != 11000
+                ]
+
+                # Only log if there are non-duplicate errors
+                if non_duplicate_errors:
+                    logger.warning(
+                        f"Some writes to {self.collection.name} failed: "
+                        f"{non_duplicate_errors}"
+                    )
+            if self.on_write_error is not None:
+                self.on_write_error(batch, bwe)
+
+    def close(self):
+        """Flush whatever is left."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
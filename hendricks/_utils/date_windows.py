@@ -0,0 +1,75 @@
+"""
+Date-window generation and concurrent execution for historical backfills.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def month_windows(from_date, to_date) -> list:
+    """
+    Split a date range into calendar-month windows.
+
+    Returns (window_beg, window_end) timestamps with inclusive day bounds:
+    the first window starts at ``from_date``, every window ends on the last
+    day of its month and the final one ends at ``to_date``.
+    """
+    from_date = pd.to_datetime(from_date).replace(tzinfo=None)
+    to_date = pd.to_datetime(to_date).replace(tzinfo=None)
+
+    windows = []
+    window_beg = from_date
+    while window_beg <= to_date:
+        next_month = (window_beg + pd.offsets.MonthBegin(1)).normalize()
+        window_end = min(next_month - pd.Timedelta(days=1), to_date)
+        windows.append((window_beg, window_end))
+        window_beg = next_month
+    return windows
+
+
+def run_windows(
+    load_window,
+    windows: list,
+    max_workers: int = 1,
+    rate_limiter=None,
+    cost: int = 0,
+) -> list:
+    """
+    Call ``load_window(window_beg, window_end)`` for every window.
+
+    Windows are independent, so up to ``max_workers`` run at once. When a
+    ``rate_limiter`` is given each window first acquires ``cost`` tokens
+    (loaders that acquire per request pass ``cost=0``). Results come back in
+    window order; the first failure is raised once every window has run.
+    """
+
+    def _run(window):
+        if rate_limiter is not None and cost:
+            rate_limiter.acquire(cost)
+        return load_window(*window)
+
+    if max_workers <= 1 or len(windows) <= 1:
+        return [_run(window) for window in windows]
+
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(windows)), thread_name_prefix="window"
+    ) as executor:
+        futures = [executor.submit(_run, window) for window in windows]
+
+    results = []
+    errors = []
+    for window, future in zip(windows, futures):
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Window {window[0]} to {window[1]} failed: {error}")
+            errors.append(error)
+            results.append(None)
+        else:
+            results.append(future.result())
+    if errors:
+        raise errors[0]
+    return results
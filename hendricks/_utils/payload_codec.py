@@ -0,0 +1,107 @@
+"""
+Versioned, compressed JSON encoding for stored article and transcript bodies.
+
+Layout: one version byte, one codec byte, then the compressed UTF-8 JSON.
+"""
+
+import ast
+import json
+import gzip
+import math
+from datetime import date, datetime
+
+try:
+    import zstandard
+except ImportError:  # Fall back to gzip when zstandard isn't installed
+    zstandard = None
+
+PAYLOAD_VERSION = 1
+
+CODEC_NONE = 0
+CODEC_GZIP = 1
+CODEC_ZSTD = 2
+
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 6
+
+
+def _to_jsonable(value):
+    """Convert pandas/numpy/datetime values into plain JSON types."""
+    if isinstance(value, dict):
+        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_to_jsonable(v) for v in value]
+    if isinstance(value, float):
+        return None if math.isnan(value) or math.isinf(value) else value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "isoformat"):  # pandas Timestamp
+        return value.isoformat()
+    if hasattr(value, "tolist"):  # numpy arrays and scalars
+        return _to_jsonable(value.tolist())
+    if hasattr(value, "model_dump"):  # pydantic models (e.g. Alpaca images)
+        return _to_jsonable(value.model_dump())
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    return str(value)
+
+
+def canonical_json(obj) -> bytes:
+    """Compact, key-sorted JSON, stable enough to hash."""
+    return json.dumps(
+        _to_jsonable(obj), separators=(",", ":"), sort_keys=True, ensure_ascii=False
+    ).encode("utf-8")
+
+
+def default_codec() -> int:
+    """zstd when available, otherwise gzip."""
+    return CODEC_ZSTD if zstandard is not None else CODEC_GZIP
+
+
+def pack_json(raw: bytes, codec: int = None) -> bytes:
+    """Compress already-serialized JSON and prepend the header."""
+    codec = default_codec() if codec is None else codec
+    if codec == CODEC_ZSTD:
+        body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    elif codec == CODEC_GZIP:
+        body = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+    elif codec == CODEC_NONE:
+        body = raw
+    else:
+        raise ValueError(f"Unsupported payload codec: {codec}")
+    return bytes((PAYLOAD_VERSION, codec)) + body
+
+
+def encode_payload(obj, codec: int = None) -> bytes:
+    """Serialize and compress a body for storage."""
+    return pack_json(canonical_json(obj), codec=codec)
+
+
+def decode_payload(data: bytes):
+    """
+    Decode a stored body back into Python objects.
+
+    Bodies written before the codec existed are Python reprs; those are
+    parsed with ``ast.literal_eval`` when possible and returned as text
+    otherwise.
+    """
+    if len(data) >= 2 and data[0] == PAYLOAD_VERSION:
+        codec = data[1]
+        body = data[2:]
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise ImportError("zstandard is required to read this payload")
+            raw = zstandard.ZstdDecompressor().decompress(body)
+        elif codec == CODEC_GZIP:
+            raw = gzip.decompress(body)
+        elif codec == CODEC_NONE:
+            raw = body
+        else:
+            raise ValueError(f"Unsupported payload codec: {codec}")
+        return json.loads(raw)
+
+    text = data.decode("utf-8", errors="replace")
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return {"raw": text}
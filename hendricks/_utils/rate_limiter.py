@@ -0,0 +1,124 @@
+"""
+Process-wide token-bucket rate limits per data provider.
+"""
+
+import os
+import threading
+import time
+
+# Requests per minute, overridable with HENDRICKS_<PROVIDER>_RATE_PER_MIN
+DEFAULT_RATES_PER_MIN = {
+    "fmp": 750,
+    "alpaca": 200,
+    "reddit": 100,
+}
+
+# Longest single sleep in AdaptiveRateLimiter, so new quota readings apply soon
+MAX_WAIT_SLICE = 1.0
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at ``rate_per_min / 60`` per second up to
+    ``burst``. ``acquire`` blocks until enough tokens are available.
+    """
+
+    def __init__(self, rate_per_min: float, burst: int = None):
+        self.rate = rate_per_min / 60.0
+        self.capacity = burst or max(1, int(self.rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self, tokens: int = 1):
+        """Block until ``tokens`` requests may be made."""
+        remaining = tokens
+        while remaining > 0:
+            # Requests larger than the bucket are taken in bucket-sized chunks
+            needed = min(remaining, self.capacity)
+            with self._lock:
+                self._refill()
+                if self._tokens >= needed:
+                    self._tokens -= needed
+                    remaining -= needed
+                    continue
+                wait = (needed - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Token bucket whose rate follows the quota the provider reports.
+
+    ``update`` takes the requests remaining and seconds until the quota
+    window resets, as sent back with each response. The refill rate becomes
+    that budget, less ``reserve`` for requests already in flight, spread
+    over the rest of the window. Once the budget is spent ``acquire`` blocks
+    until the window resets, then falls back to the configured rate.
+    """
+
+    def __init__(self, rate_per_min: float, burst: int = None, reserve: int = 10):
+        super().__init__(rate_per_min, burst)
+        self.base_rate = self.rate
+        self.reserve = reserve
+        self._resume_at = 0.0
+
+    def update(self, remaining: float, seconds_to_reset: float):
+        """Re-pace from the provider's latest quota reading."""
+        with self._lock:
+            self._refill()
+            budget = remaining - self.reserve
+            if budget <= 0:
+                self._tokens = 0.0
+                self._resume_at = time.monotonic() + max(seconds_to_reset, 0.0)
+                self.rate = self.base_rate
+            else:
+                self.rate = budget / max(seconds_to_reset, 1.0)
+                self._tokens = min(self._tokens, budget)
+
+    def acquire(self, tokens: int = 1):
+        """Block until ``tokens`` requests fit the current quota."""
+        remaining = tokens
+        while remaining > 0:
+            needed = min(remaining, self.capacity)
+            with self._lock:
+                self._refill()
+                paused = self._resume_at - time.monotonic()
+                if paused <= 0 and self._tokens >= needed:
+                    self._tokens -= needed
+                    remaining -= needed
+                    continue
+                wait = paused if paused > 0 else (needed - self._tokens) / self.rate
+            time.sleep(min(wait, MAX_WAIT_SLICE))
+
+
+_LIMITERS = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(provider: str, limiter_class=RateLimiter) -> RateLimiter:
+    """
+    Return the shared limiter for a provider, creating it on first use as
+    a ``limiter_class``.
+    """
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(provider)
+        if limiter is None:
+            rate = float(
+                os.getenv(
+                    f"HENDRICKS_{provider.upper()}_RATE_PER_MIN",
+                    DEFAULT_RATES_PER_MIN.get(provider, 300),
+                )
+            )
+            limiter = limiter_class(rate)
+            _LIMITERS[provider] = limiter
+        return limiter
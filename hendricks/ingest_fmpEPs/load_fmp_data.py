@@ -11,6 +11,8 @@ from pandas.tseries.offsets import CustomBusinessDay
 
 from quantum_trade_utilities.core.get_path import get_path
 from hendricks.ingest_fmpEPs.lfd_enum import FMPEndpoint
+from hendricks._utils.date_windows import month_windows, run_windows
+from hendricks._utils.rate_limiter import get_rate_limiter
 
 dotenv.load_dotenv()
 
@@ -32,6 +34,7 @@ class FinLoader:
         minute_adjustment: bool = True,
         fmp_endpoint: dict = None,
         mongo_db: str = "stocksDB",
+        max_workers: int = 4,
     ):
         self.tickers = tickers
         self.from_date = pd.to_datetime(from_date)
@@ -44,6 +47,8 @@ class FinLoader:
         self.minute_adjustment = minute_adjustment
         self.fmp_endpoint = fmp_endpoint
         self.mongo_db = mongo_db
+        # Daily windows processed in parallel under the shared FMP rate limit
+        self.max_workers = max(1, int(max_workers or 1))
         # Create US business day calendar
         self.us_bd = CustomBusinessDay(calendar=USFederalHolidayCalendar())
 
@@ -90,53 +95,31 @@ class FinLoader:
             )
 
         handler_function = endpoint.function
-        from_date = pd.to_datetime(self.from_date)
-        to_date = pd.to_datetime(self.to_date)
-
-        # If from_date and to_date are more than 30 days, loop by month
-        if (to_date - from_date).days > 30:
-            # Loop by month
-            loop_mon_beg = from_date
-            loop_mon_end = from_date + pd.DateOffset(months=1)
-            while loop_mon_end <= to_date:
-                logging.info(f"handler_function: {handler_function}")
-                logging.info(f"tickers: {self.tickers}")
-                logging.info(f"from_date: {loop_mon_beg.strftime('%Y-%m-%d')}")
-                logging.info(f"to_date: {loop_mon_end.strftime('%Y-%m-%d')}")
-                logging.info(f"collection_name: {self.collection_name}")
-
-                handler_function(
-                    tickers=self.tickers,
-                    from_date=loop_mon_beg.strftime("%Y-%m-%d"),
-                    to_date=loop_mon_end.strftime("%Y-%m-%d"),
-                    collection_name=self.collection_name,
-                    ep=self.fmp_endpoint,
-                    mongo_db=self.mongo_db,
-                )
-
-                loop_mon_beg = loop_mon_end
-                loop_mon_end = loop_mon_beg + pd.DateOffset(months=1)
-
-                # Handle the final partial month if it exists
-                if loop_mon_beg < to_date < loop_mon_end:
-                    handler_function(
-                        tickers=self.tickers,
-                        from_date=loop_mon_beg.strftime("%Y-%m-%d"),
-                        to_date=to_date.strftime("%Y-%m-%d"),
-                        collection_name=self.collection_name,
-                        ep=self.fmp_endpoint,
-                        mongo_db=self.mongo_db,
-                    )
-        else:
-            # For periods less than 30 days, make a single API call
+
+        def load_window(window_beg, window_end):
+            logging.info(f"handler_function: {handler_function}")
+            logging.info(f"tickers: {self.tickers}")
+            logging.info(f"from_date: {window_beg.strftime('%Y-%m-%d')}")
+            logging.info(f"to_date: {window_end.strftime('%Y-%m-%d')}")
+            logging.info(f"collection_name: {self.collection_name}")
+
             handler_function(
                 tickers=self.tickers,
-                from_date=self.from_date,
-                to_date=self.to_date,
+                from_date=window_beg.strftime("%Y-%m-%d"),
+                to_date=window_end.strftime("%Y-%m-%d"),
                 collection_name=self.collection_name,
                 ep=self.fmp_endpoint,
                 mongo_db=self.mongo_db,
             )
 
+        # Daily handlers make one request per ticker per window
+        run_windows(
+            load_window,
+            month_windows(self.from_date, self.to_date),
+            max_workers=self.max_workers,
+            rate_limiter=get_rate_limiter("fmp"),
+            cost=len(self.tickers),
+        )
+
         print(f"Completed processing for {self.tickers}")
         return None
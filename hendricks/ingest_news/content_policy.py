@@ -0,0 +1,66 @@
+"""
+Enum for how the news loaders acquire article bodies.
+"""
+
+from enum import Enum
+
+# Markers providers append when they cut an article short
+TRUNCATION_MARKERS = ("...", "…", "chars]", "[Read more]")
+
+
+def is_missing_or_truncated(content, min_chars: int = 200) -> bool:
+    """Check whether provider content is absent or looks cut short."""
+    if not isinstance(content, str):
+        return True
+    text = content.strip()
+    if not text or text == "N/A":
+        return True
+    if len(text) < min_chars:
+        return True
+    return text.endswith(TRUNCATION_MARKERS)
+
+
+class ContentPolicy(Enum):
+    """
+    Enum for article content acquisition policies.
+    """
+
+    # Always scrape the article page
+    SCRAPE = "scrape"
+    # Use the provider's content, scrape only when missing or truncated
+    PROVIDER_FIRST = "provider_first"
+    # Never scrape, store whatever the provider returned
+    NEVER = "never"
+
+    @classmethod
+    def get_by_name(cls, name: str = None) -> "ContentPolicy":
+        """Get policy by name, defaulting to provider_first."""
+        if name is None:
+            return cls.PROVIDER_FIRST
+        try:
+            return cls(name)
+        except ValueError:
+            raise ValueError(
+                f"Unsupported content policy: {name}. "
+                f"Use one of {[policy.value for policy in cls]}"
+            )
+
+    def needs_scrape(self, provider_content) -> bool:
+        """Whether the article page should be fetched."""
+        if self is ContentPolicy.SCRAPE:
+            return True
+        if self is ContentPolicy.NEVER:
+            return False
+        return is_missing_or_truncated(provider_content)
+
+    def select_html(self, provider_content, scraped_html, fallback):
+        """Pick the body to store from provider content, scrape and fallback."""
+        has_content = not is_missing_or_truncated(provider_content, min_chars=1)
+        if self is ContentPolicy.SCRAPE and scraped_html:
+            return scraped_html
+        if self is ContentPolicy.PROVIDER_FIRST:
+            if not is_missing_or_truncated(provider_content):
+                return provider_content
+            if scraped_html:
+                return scraped_html
+        return provider_content if has_content else fallback
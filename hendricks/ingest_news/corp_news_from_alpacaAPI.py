@@ -3,17 +3,14 @@ Load historical quote data from Alpaca API into a MongoDB collection.
 """
 
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-import hashlib
 import logging
 import pytz
 import pandas as pd
 from dotenv import load_dotenv
 from alpaca.data.historical import NewsClient
+from alpaca.data.models import NewsSet
 from alpaca.data.requests import NewsRequest
 from pymongo import UpdateOne
-from pymongo.errors import BulkWriteError
-from gridfs import GridFS
 
 load_dotenv()
 from quantum_trade_utilities.data.load_credentials import load_credentials
@@ -22,8 +19,19 @@ from quantum_trade_utilities.data.mongo_coll_verification import (
     confirm_mongo_collect_exists,
 )
 from quantum_trade_utilities.core.get_path import get_path
-from quantum_trade_utilities.io.grab_html import grab_html
 
+from hendricks._utils.rate_limiter import get_rate_limiter
+from hendricks.ingest_news.content_policy import ContentPolicy
+from hendricks.ingest_news.html_prefetch import HtmlPrefetcher
+from hendricks.ingest_news.near_duplicates import NearDuplicateIndex, is_copy
+from hendricks.ingest_news.news_documents import (
+    ArticleFields,
+    build_document,
+    classify,
+    write_operations,
+)
+from hendricks.ingest_news.news_storage import NewsContentStore
+from hendricks.ingest_news.storage_mode import ArticleCollector, StorageMode
 
 # Set up logging
 logging.basicConfig(level=logging.WARNING)  # Set to WARNING to suppress DEBUG messages
@@ -31,6 +39,97 @@ logger = logging.getLogger("pymongo")
 logger.setLevel(logging.WARNING)  # Suppress pymongo debug messages
 
 
+def _fetch_ticker_news(
+    client, ticker, from_date, to_date, articles_limit, include_content, max_pages=None
+):
+    """
+    Request one ticker's news for the window and return it as a DataFrame
+    (None if empty) and whether it was cut short.
+
+    ``articles_limit`` is the page size. ``NewsClient.get_news`` drops the
+    page token and stops at ``limit``, so pages are requested from the
+    /news endpoint directly and followed through ``next_page_token`` until
+    the window is exhausted, or ``max_pages`` have been read (newest first);
+    only then is the result truncated.
+    """
+    print(
+        f"from_date: {from_date}, to_date: {to_date}, articles_limit: {articles_limit}, include_content: {include_content}"
+    )
+    rate_limiter = get_rate_limiter("alpaca")
+    # Create the news request
+    params = NewsRequest(
+        symbols=ticker,
+        start=from_date,
+        end=to_date,
+        limit=articles_limit,
+        include_content=include_content,
+        sort="DESC",  # Get newest articles first
+        news_types=["press_release", "article", "blog"],  # Include all news types
+        # sources=["businesswire", "reuters", "benzinga", "globe_newswire"],  # Uncomment to specify sources
+    ).to_request_fields()
+
+    pages = []
+    truncated = False
+    while True:
+        # Get the news data, sharing the Alpaca budget with concurrent windows
+        rate_limiter.acquire()
+        response = client.get("/news", params)
+        news = NewsSet(response)
+        if len(news.data["news"]) > 0:
+            pages.append(news.df)
+
+        params["page_token"] = response.get("next_page_token")
+        if not params["page_token"]:
+            break
+        if max_pages is not None and len(pages) >= max_pages:
+            truncated = True
+            break
+
+    # Check length before converting to DataFrame
+    if not pages:
+        logger.info(f"No news found for {ticker}")
+        return None, truncated
+
+    news = pd.concat(pages) if len(pages) > 1 else pages[0]
+    logger.info(f"Alpaca API Response Shape: {news.shape} over {len(pages)} pages")
+    logger.info(f"Alpaca API Columns: {news.columns.tolist()}")
+
+    print("resetting index")
+    # Prepare the DataFrame
+    news.reset_index(inplace=True)
+    news_df = news.copy()
+    news_df.columns = news_df.columns.str.lower()
+
+    print("renaming barset 'symbol' to 'ticker'")
+    # Rename barset 'symbol' to 'ticker'
+    news_df.rename(columns={"symbols": "tickers"}, inplace=True)
+    return news_df, truncated
+
+
+def _content_data(row, html_content) -> dict:
+    """An Alpaca article's body, stored inline or in GridFS."""
+    return {
+        "summary": row["summary"],
+        "content": row["content"],
+        "images": row["images"],
+        "html": html_content,
+        "article_tickers": row["tickers"],
+        "author": row["author"],
+        "article_created_at": row["created_at"],
+        "article_updated_at": row["updated_at"],
+    }
+
+
+ALPACA_FIELDS = ArticleFields(
+    source="alpaca",
+    published="created_at",
+    headline="headline",
+    summary="summary",
+    article_source=lambda row: row["url"].split(".")[1].split("/")[-1] + ".com",
+    content_data=_content_data,
+)
+
+
 def news_from_alpacaAPI(
     tickers=None,
     collection_name=None,
@@ -41,15 +140,28 @@ def news_from_alpacaAPI(
     include_content: bool = True,
     gridfs_bucket: str = None,
     mongo_db: str = "stocksDB",
+    content_policy: str = None,
+    inline_max_bytes: int = None,
+    storage_mode: str = None,
+    near_duplicate_threshold: float = None,
+    max_pages: int = None,
 ):
     """
     Load historical quote data from Alpaca API into a MongoDB collection.
+
+    Returns ``{ticker: (articles, truncated)}``: how many articles the API
+    returned per ticker and whether ``max_pages`` cut the window short, which
+    the caller uses to size (or split) its date windows.
+
+    With ``storage_mode="article"`` articles are deduplicated across every
+    ticker before scraping, and each is written once with a ``tickers`` array.
     """
 
     print(f"Now executing news_from_alpacaAPI for {tickers}")
 
-    ep_timestamp_field = "created_at"
     cred_key = "alpaca_news"
+    policy = ContentPolicy.get_by_name(content_policy)
+    mode = StorageMode.get_by_name(storage_mode)
 
     if creds_file_path is None:
         creds_file_path = get_path("creds")
@@ -116,168 +228,91 @@ def news_from_alpacaAPI(
         unique=True,
         background=True,  # Allow other operations while building index
     )
+    mode.create_indexes(collection)
 
-    # Initialize GridFS
-    fs = GridFS(db, collection=gridfs_bucket)
+    # Optional MinHash index linking syndicated copies to a canonical article
+    near_dup_index = (
+        NearDuplicateIndex(collection, threshold=near_duplicate_threshold)
+        if near_duplicate_threshold
+        else None
+    )
 
-    print("looping through tickers")
-    for ticker in tickers:
-        # drop news variable if it exists
-        if "news" in locals():
-            del news
+    # Initialize GridFS, storing each distinct body once
+    content_store = NewsContentStore(
+        db, gridfs_bucket, inline_max_bytes=inline_max_bytes
+    )
 
-        print(
-            f"from_date: {from_date}, to_date: {to_date}, articles_limit: {articles_limit}, include_content: {include_content}"
-        )
-        print("creating news request")
-        # Create the news request
-        request_params = NewsRequest(
-            symbols=ticker,
-            start=from_date,
-            end=to_date,
-            limit=articles_limit,
-            include_content=include_content,
-            sort="DESC",  # Get newest articles first
-            news_types=["press_release", "article", "blog"],  # Include all news types
-            # sources=["businesswire", "reuters", "benzinga", "globe_newswire"],  # Uncomment to specify sources
-        )
+    # Fetches article HTML concurrently, one page of results at a time
+    prefetcher = HtmlPrefetcher()
 
-        print("getting news data")
-        # Get the news data
-        news = client.get_news(request_params)
+    # Article-centric mode gathers every ticker's results before any work
+    collector = ArticleCollector()
+    window_stats = {}
 
-        # Check length before converting to DataFrame
-        if len(news.data["news"]) == 0:
-            logger.info(f"No news found for {ticker}")
+    print("looping through tickers")
+    for ticker in tickers:
+        news_df, truncated = _fetch_ticker_news(
+            client,
+            ticker,
+            from_date,
+            to_date,
+            articles_limit,
+            include_content,
+            max_pages=max_pages,
+        )
+        window_stats[ticker] = (0 if news_df is None else len(news_df), truncated)
+        if news_df is None:
             continue
 
-        news = news.df
-        logger.info(f"Alpaca API Response Shape: {news.shape}")
-        logger.info(f"Alpaca API Columns: {news.columns.tolist()}")
-
-        print("resetting index")
-        # Prepare the DataFrame
-        news.reset_index(inplace=True)
-        news_df = news.copy()
-        news_df.columns = news_df.columns.str.lower()
+        if mode is StorageMode.ARTICLE:
+            for _, row in news_df.iterrows():
+                collector.add(row["url"], row, [ticker, *row["tickers"]])
+            continue
 
-        print("renaming barset 'symbol' to 'ticker'")
-        # Rename barset 'symbol' to 'ticker'
-        news_df.rename(columns={"symbols": "tickers"}, inplace=True)
+        print("prefetching html")
+        # Only fetch pages whose body the provider didn't already return
+        near_dups = classify(
+            near_dup_index, (row for _, row in news_df.iterrows()), ALPACA_FIELDS
+        )
+        scrape_urls = [
+            row["url"]
+            for _, row in news_df.iterrows()
+            if policy.needs_scrape(row["content"])
+            and not is_copy(near_dups.get(row["url"]))
+        ]
+        html_by_url = prefetcher.fetch(scrape_urls)
 
         print("looping through rows")
         bulk_operations = []
         for _, row in news_df.iterrows():
-            print("grabbing html")
-            html_content = grab_html(row["url"])
-
-            if ep_timestamp_field == "today":
-                timestamp = datetime.now(ZoneInfo("America/Chicago"))
-            elif ep_timestamp_field == "year":
-                # Jan 1st of the year
-                timestamp = datetime(
-                    int(row["year"]), 1, 1, tzinfo=ZoneInfo("America/New_York")
-                )
-            elif ep_timestamp_field == "timestamp":
-                timestamp = datetime.fromtimestamp(
-                    row["timestamp"], tz=ZoneInfo("America/New_York")
-                )
-            else:
-                raw_date = row[ep_timestamp_field]
-                if (
-                    isinstance(raw_date, str) and len(raw_date.split()) == 1
-                ):  # Just a date
-                    # Parse the date and explicitly set to midnight EST
-                    date_obj = datetime.strptime(raw_date, "%Y-%m-%d").date()
-                    timestamp = datetime.combine(
-                        date_obj,
-                        datetime.min.time(),
-                        tzinfo=ZoneInfo("America/New_York"),  # Explicitly EST
-                    )
-                else:  # Has time component
-                    # Parse with pandas and ensure EST
-                    timestamp = pd.to_datetime(raw_date)
-                    if timestamp.tzinfo is None:
-                        # If no timezone provided, add EST to the datetime object
-                        timestamp = timestamp.tz_localize("America/New_York")
-                    else:
-                        # If it has a timezone, convert to EST
-                        timestamp = timestamp.astimezone(ZoneInfo("America/New_York"))
-
-            created_at = datetime.now(ZoneInfo("America/Chicago"))
-
-            # Create a hash of the actual estimate values to detect changes
-            feature_values = {
-                "headline": row["headline"],
-                "link": row["url"],
-            }
-            feature_hash = hashlib.sha256(str(feature_values).encode()).hexdigest()
-
-            # Create unique_id when there isn't a good option in response
-            f1 = ticker
-            f2 = row["created_at"]
-            f3 = row["headline"]
-            f4 = row["summary"]
-            f5 = row["url"]
-
-            # Create hash of f1, f2, f3, f4
-            unique_id = hashlib.sha256(f"{f1}{f2}{f3}{f4}{f5}".encode()).hexdigest()
-
-            # HTML should be the row['content'] if it exists, otherwise it should be the row['summary'  ]
-            if row["content"]:
-                html_content = row["content"]
-            else:
-                html_content = row["summary"]
-
-            # Store large content in GridFS
-            content_data = {
-                "summary": row["summary"],
-                "content": row["content"],
-                "images": row["images"],
-                "html": html_content,
-                "article_tickers": row["tickers"],
-                "author": row["author"],
-                "article_created_at": row["created_at"],
-                "article_updated_at": row["updated_at"],
-            }
-
-            # Store in GridFS with metadata
-            content_id = fs.put(
-                str(content_data).encode("utf-8"),
-                filename=row["url"],
-                ticker=ticker,
-                source="alpaca",
+            document = build_document(
+                row,
+                ticker,
+                ALPACA_FIELDS,
+                policy,
+                html_by_url,
+                content_store,
+                near_dups.get(row["url"]),
             )
 
-            article_source = row["url"].split(".")[1].split("/")[-1] + ".com"
-
-            # Streamlined main document
-            document = {
-                "unique_id": unique_id,
-                "timestamp": timestamp,
-                "ticker": ticker,
-                ##########################################
-                ##########################################
-                "article_source": article_source,
-                **feature_values,
-                "feature_hash": feature_hash,
-                ##########################################
-                ##########################################
-                "source": "alpaca",
-                "created_at": created_at,
-                "content_id": content_id,  # Reference to GridFS content
-            }
-
             # Modified update operation
             bulk_operations.append(
                 UpdateOne(
                     {
                         "timestamp": document["timestamp"],
                         "link": document["link"],
-                        # Only update if headline changes
+                        # Only update if headline or content changes
                         "$or": [
                             {"headline": {"$ne": document["headline"]}},
-                            {"content_id": {"$ne": document["content_id"]}},
+                            (
+                                {"content_hash": {"$ne": document["content_hash"]}}
+                                if "content_hash" in document
+                                else {
+                                    "canonical_link": {
+                                        "$ne": document["canonical_link"]
+                                    }
+                                }
+                            ),
                         ],
                     },
                     {"$set": document},
@@ -285,28 +320,37 @@ def news_from_alpacaAPI(
                 )
             )
 
-            # Execute bulk operations if any exist
-            if bulk_operations:
-                try:
-                    result = collection.bulk_write(bulk_operations, ordered=False)
-                    logger.info(
-                        f"Processed {len(bulk_operations)} new items for {ticker}"
-                    )
-                    logger.info(
-                        f"Inserted: {result.upserted_count}, Modified: {result.modified_count}"
-                    )
-                except BulkWriteError as bwe:
-                    # Filter out duplicate key errors (code 11000)
-                    non_duplicate_errors = [
-                        error
-                        for error in bwe.details["writeErrors"]
-                        if error["code"] != 11000
-                    ]
-
-                    # Only log if there are non-duplicate errors
-                    if non_duplicate_errors:
-                        logger.warning(
-                            f"Some writes failed for {ticker}: {non_duplicate_errors}"
-                        )
+        # Execute bulk operations once per ticker
+        write_operations(collection, bulk_operations, ticker)
+
+    if mode is StorageMode.ARTICLE and len(collector):
+        print(f"processing {len(collector)} distinct articles")
+        near_dups = classify(
+            near_dup_index, (row for row, _ in collector.items()), ALPACA_FIELDS
+        )
+        html_by_url = prefetcher.fetch(
+            row["url"]
+            for row, _ in collector.items()
+            if policy.needs_scrape(row["content"])
+            and not is_copy(near_dups.get(row["url"]))
+        )
+        bulk_operations = [
+            mode.update_operation(
+                build_document(
+                    row,
+                    None,
+                    ALPACA_FIELDS,
+                    policy,
+                    html_by_url,
+                    content_store,
+                    near_dups.get(row["url"]),
+                ),
+                article_tickers,
+            )
+            for row, article_tickers in collector.items()
+        ]
+        write_operations(collection, bulk_operations, f"{len(tickers)} tickers")
 
+    prefetcher.report()
     logger.info("Articles imported successfully!")
+    return window_stats
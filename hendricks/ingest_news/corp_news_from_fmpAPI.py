@@ -2,17 +2,12 @@
 Load historical quote data from Alpaca API into a MongoDB collection.
 """
 
-from datetime import datetime
-import hashlib
 import logging
-from zoneinfo import ZoneInfo
 import pytz
 import pandas as pd
 from dotenv import load_dotenv
 import requests
 from pymongo import UpdateOne
-from pymongo.errors import BulkWriteError
-from gridfs import GridFS
 
 load_dotenv()
 from quantum_trade_utilities.data.load_credentials import load_credentials
@@ -22,7 +17,19 @@ from quantum_trade_utilities.data.mongo_coll_verification import (
 )
 from quantum_trade_utilities.core.get_path import get_path
 from quantum_trade_utilities.data.request_url_constructor import request_url_constructor
-from quantum_trade_utilities.io.grab_html import grab_html
+
+from hendricks._utils.rate_limiter import get_rate_limiter
+from hendricks.ingest_news.content_policy import ContentPolicy
+from hendricks.ingest_news.html_prefetch import HtmlPrefetcher
+from hendricks.ingest_news.near_duplicates import NearDuplicateIndex, is_copy
+from hendricks.ingest_news.news_documents import (
+    ArticleFields,
+    build_document,
+    classify,
+    write_operations,
+)
+from hendricks.ingest_news.news_storage import NewsContentStore
+from hendricks.ingest_news.storage_mode import ArticleCollector, StorageMode
 
 # from hendricks._utils.std_article_time import std_article_time
 
@@ -32,6 +39,52 @@ logger = logging.getLogger("pymongo")
 logger.setLevel(logging.WARNING)  # Suppress pymongo debug messages
 
 
+def _content_data(row, html_content) -> dict:
+    """An FMP article's body, stored inline or in GridFS."""
+    return {
+        "summary": row["text"],
+        "content": row.get("content", "N/A"),
+        "images": row.get("image"),
+        "html": html_content,
+        "article_tickers": [row["symbol"]],
+        "author": "N/A",
+        "article_created_at": row["publishedDate"],
+        "article_updated_at": row["publishedDate"],
+    }
+
+
+# FMP only returns a snippet in 'text', so bodies usually come from scraping
+FMP_FIELDS = ArticleFields(
+    source="fmp",
+    published="publishedDate",
+    headline="title",
+    summary="text",
+    article_source=lambda row: row["site"],
+    content_data=_content_data,
+)
+
+
+def _normalize_symbol(symbol) -> str:
+    """Compare symbols regardless of case and class separator (BRK-B, BRK.B)."""
+    return str(symbol).strip().upper().replace("-", ".").replace("/", ".")
+
+
+def _row_ticker(row, batch: list) -> str:
+    """
+    The requested ticker an FMP result belongs to, or None when its symbol
+    matches none of the batch.
+    """
+    symbol = row.get("symbol")
+    if not symbol or pd.isna(symbol):
+        # Single-ticker requests only ever return that ticker
+        return batch[0] if len(batch) == 1 else None
+    wanted = _normalize_symbol(symbol)
+    for ticker in batch:
+        if _normalize_symbol(ticker) == wanted:
+            return ticker
+    return None
+
+
 def news_from_fmpAPI(
     tickers=None,
     collection_name=None,
@@ -42,13 +95,27 @@ def news_from_fmpAPI(
     articles_limit: int = 1,
     include_content: bool = True,
     mongo_db: str = "stocksDB",
+    content_policy: str = None,
+    inline_max_bytes: int = None,
+    storage_mode: str = None,
+    near_duplicate_threshold: float = None,
+    ticker_batch_size: int = 1,
 ):
     """
     Load historical quote data from Alpaca API into a MongoDB collection.
+
+    With ``storage_mode="article"`` articles are deduplicated across every
+    ticker before scraping, and each is written once with a ``tickers`` array.
+
+    ``ticker_batch_size`` tickers are requested per call (FMP accepts a
+    comma-separated list) and the results are split back out by symbol.
+    Tickers that reach ``articles_limit`` are dropped from the query, so a
+    busy ticker doesn't page its quieter batch-mates through the window.
     """
 
-    ep_timestamp_field = "publishedDate"
     cred_key = "fmp_api_findata"
+    policy = ContentPolicy.get_by_name(content_policy)
+    mode = StorageMode.get_by_name(storage_mode)
 
     if creds_file_path is None:
         creds_file_path = get_path("creds")
@@ -91,17 +158,49 @@ def news_from_fmpAPI(
         unique=True,
         background=True,  # Allow other operations while building index
     )
+    mode.create_indexes(collection)
+
+    # Optional MinHash index linking syndicated copies to a canonical article
+    near_dup_index = (
+        NearDuplicateIndex(collection, threshold=near_duplicate_threshold)
+        if near_duplicate_threshold
+        else None
+    )
 
     # Convert from_date and to_date to 'yyyy-mm-dd' format
     from_date = from_date.strftime("%Y-%m-%d")
     to_date = to_date.strftime("%Y-%m-%d")
 
-    # Initialize GridFS
-    fs = GridFS(db, collection=gridfs_bucket)
+    # Initialize GridFS, storing each distinct body once
+    content_store = NewsContentStore(
+        db, gridfs_bucket, inline_max_bytes=inline_max_bytes
+    )
+
+    # Fetches article HTML concurrently, one page of results at a time
+    prefetcher = HtmlPrefetcher()
+
+    # Article-centric mode gathers every ticker's results before any work
+    collector = ArticleCollector()
 
-    for ticker in tickers:
+    # Shared with every other FMP loader running in this process
+    rate_limiter = get_rate_limiter("fmp")
+
+    ticker_batch_size = max(1, int(ticker_batch_size or 1))
+    ticker_batches = [
+        tickers[i : i + ticker_batch_size]
+        for i in range(0, len(tickers), ticker_batch_size)
+    ]
+
+    for batch in ticker_batches:
+        # Tickers still under the articles limit, the only ones requested
+        pending = list(batch)
         page = 0
-        while True:  # Replace a=True with clearer logic
+        # articles_limit applies to each ticker, not the batch as a whole
+        ticker_counts = dict.fromkeys(batch, 0)
+        # Rows already stored, which a narrowed query returns again
+        seen = set()
+        while pending:
+            ticker = ",".join(pending)
             url = request_url_constructor(
                 endpoint="stock_news",
                 base_url=BASE_URL,
@@ -114,6 +213,7 @@ def news_from_fmpAPI(
             )
 
             print(f"URL: {url}")
+            rate_limiter.acquire()
             response = requests.get(url)
 
             if response.status_code != 200:
@@ -130,160 +230,119 @@ def news_from_fmpAPI(
             logger.info(f"DataFrame shape: {res_df.shape}")
             logger.info(f"DataFrame columns: {res_df.columns.tolist()}")
 
-            # Sort results by timestamp in descending order
-            if ep_timestamp_field != "today":
-                res_df.sort_values(by=ep_timestamp_field, ascending=False, inplace=True)
-
             # Sort results by publishedDate in descending order
             res_df.sort_values(by="publishedDate", ascending=False, inplace=True)
 
-            # Process news items in bulk
-            bulk_operations = []
+            # Attribute each result to its requested ticker, within that ticker's limit
+            page_rows = []
             for _, row in res_df.iterrows():
-                html_content = grab_html(row["url"])
-
-                if ep_timestamp_field == "today":
-                    timestamp = datetime.now(ZoneInfo("America/Chicago"))
-                elif ep_timestamp_field == "year":
-                    # Jan 1st of the year
-                    timestamp = datetime(
-                        int(row["year"]), 1, 1, tzinfo=ZoneInfo("America/New_York")
+                row_ticker = _row_ticker(row, pending)
+                if row_ticker is None:
+                    logger.warning(
+                        f"Skipping {row.get('url')}: symbol {row.get('symbol')!r} "
+                        f"is not one of {pending}"
                     )
-                elif ep_timestamp_field == "timestamp":
-                    timestamp = datetime.fromtimestamp(
-                        row["timestamp"], tz=ZoneInfo("America/New_York")
-                    )
-                else:
-                    raw_date = row[ep_timestamp_field]
-                    if (
-                        isinstance(raw_date, str) and len(raw_date.split()) == 1
-                    ):  # Just a date
-                        # Parse the date and explicitly set to midnight EST
-                        date_obj = datetime.strptime(raw_date, "%Y-%m-%d").date()
-                        timestamp = datetime.combine(
-                            date_obj,
-                            datetime.min.time(),
-                            tzinfo=ZoneInfo("America/New_York"),  # Explicitly EST
-                        )
-                    else:  # Has time component
-                        # Parse with pandas and ensure EST
-                        timestamp = pd.to_datetime(raw_date)
-                        if timestamp.tzinfo is None:
-                            # If no timezone provided, add EST to the datetime object
-                            timestamp = timestamp.tz_localize("America/New_York")
-                        else:
-                            # If it has a timezone, convert to EST
-                            timestamp = timestamp.astimezone(
-                                ZoneInfo("America/New_York")
-                            )
-
-                created_at = datetime.now(ZoneInfo("America/Chicago"))
-
-                # Create a hash of the actual estimate values to detect changes
-                feature_values = {
-                    "headline": row["title"],
-                    "link": row["url"],
-                }
-                feature_hash = hashlib.sha256(str(feature_values).encode()).hexdigest()
-
-                # Create unique_id when there isn't a good option in response
-                f1 = ticker
-                f2 = row["publishedDate"]
-                f3 = row["title"]
-                f4 = row["text"]
-                f5 = row["url"]
-
-                # Create hash of f1, f2, f3, f4
-                unique_id = hashlib.sha256(f"{f1}{f2}{f3}{f4}{f5}".encode()).hexdigest()
-
-                # Store large content in GridFS
-                content_data = {
-                    "summary": row["text"],
-                    "content": row.get("content", "N/A"),
-                    "images": row.get("image"),
-                    "html": html_content,
-                    "article_tickers": [row["symbol"]],
-                    "author": "N/A",
-                    "article_created_at": row["publishedDate"],
-                    "article_updated_at": row["publishedDate"],
-                    # "timestamp_conversion_result": conversion_result[1],
-                }
-
-                # Store in GridFS with metadata
-                content_id = fs.put(
-                    str(content_data).encode("utf-8"),
-                    filename=row["url"],
-                    ticker=ticker,
-                    source="fmp",
+                    continue
+                if articles_limit and ticker_counts[row_ticker] >= articles_limit:
+                    continue
+                if (row_ticker, row["url"]) in seen:
+                    continue
+                seen.add((row_ticker, row["url"]))
+                ticker_counts[row_ticker] += 1
+                page_rows.append((row, row_ticker))
+
+            if mode is StorageMode.ARTICLE:
+                for row, row_ticker in page_rows:
+                    collector.add(row["url"], row, [row_ticker])
+            else:
+                # Fetch every article on the page that needs scraping before building documents
+                near_dups = classify(
+                    near_dup_index, (row for row, _ in page_rows), FMP_FIELDS
                 )
-
-                # Streamlined main document
-                document = {
-                    "unique_id": unique_id,
-                    "timestamp": timestamp,
-                    "ticker": ticker,
-                    ##########################################
-                    ##########################################
-                    "article_source": row["site"],
-                    # Unpack the feature_hash
-                    **feature_values,
-                    "feature_hash": feature_hash,
-                    ##########################################
-                    ##########################################
-                    "source": "fmp",
-                    "created_at": created_at,
-                    "content_id": content_id,  # Reference to GridFS content
-                }
-
-                # Replace the find_one and separate insert/update with a single upsert
-                bulk_operations.append(
-                    UpdateOne(
-                        {
-                            # Create unique_id when there isn't a good option in response
-                            "timestamp": document["timestamp"],
-                            "link": document["link"],
-                            # Only update if hash is different or document doesn't exist
-                            "$or": [
-                                {"feature_hash": {"$ne": feature_hash}},
-                                {"feature_hash": {"$exists": False}},
-                            ],
-                        },
-                        {"$set": document},
-                        upsert=True,
+                scrape_urls = [
+                    row["url"]
+                    for row, _ in page_rows
+                    if policy.needs_scrape(row.get("content"))
+                    and not is_copy(near_dups.get(row["url"]))
+                ]
+                html_by_url = prefetcher.fetch(scrape_urls)
+
+                # Process news items in bulk
+                bulk_operations = []
+                for row, row_ticker in page_rows:
+                    document = build_document(
+                        row,
+                        row_ticker,
+                        FMP_FIELDS,
+                        policy,
+                        html_by_url,
+                        content_store,
+                        near_dups.get(row["url"]),
                     )
-                )
 
-            # Execute bulk operations for this page
-            if bulk_operations:
-                try:
-                    result = collection.bulk_write(bulk_operations, ordered=False)
-                    logger.info(
-                        f"Page {page}: Processed {len(bulk_operations)} items for {ticker}"
-                    )
-                    logger.info(
-                        f"Inserted: {result.upserted_count}, Modified: {result.modified_count}"
-                    )
-                except BulkWriteError as bwe:
-                    # Filter out duplicate key errors (code 11000)
-                    non_duplicate_errors = [
-                        error
-                        for error in bwe.details["writeErrors"]
-                        if error["code"] != 11000
-                    ]
-
-                    # Only log if there are non-duplicate errors
-                    if non_duplicate_errors:
-                        logger.warning(
-                            f"Some writes failed for {ticker}: {non_duplicate_errors}"
+                    # Replace the find_one and separate insert/update with a single upsert
+                    bulk_operations.append(
+                        UpdateOne(
+                            {
+                                # Create unique_id when there isn't a good option in response
+                                "timestamp": document["timestamp"],
+                                "link": document["link"],
+                                # Only update if hash is different or document doesn't exist
+                                "$or": [
+                                    {"feature_hash": {"$ne": document["feature_hash"]}},
+                                    {"feature_hash": {"$exists": False}},
+                                ],
+                            },
+                            {"$set": document},
+                            upsert=True,
                         )
-                finally:
-                    bulk_operations = []  # Clear bulk operations for next page
+                    )
+
+                # Execute bulk operations for this page
+                write_operations(
+                    collection, bulk_operations, f"Page {page} for {ticker}"
+                )
 
             page += 1
 
-            # Check if we've hit the articles limit
-            if articles_limit and page * len(res) >= articles_limit:
-                logger.info(f"Reached articles limit of {articles_limit} for {ticker}")
-                break
+            if articles_limit:
+                capped = [t for t in pending if ticker_counts[t] >= articles_limit]
+                if capped:
+                    logger.info(
+                        f"Reached articles limit of {articles_limit} for {capped}"
+                    )
+                    # A new symbol list pages from the top again
+                    pending = [t for t in pending if t not in capped]
+                    page = 0
+
+        logger.info(f"Completed processing for {','.join(batch)}")
+
+    if mode is StorageMode.ARTICLE and len(collector):
+        logger.info(f"Processing {len(collector)} distinct articles")
+        near_dups = classify(
+            near_dup_index, (row for row, _ in collector.items()), FMP_FIELDS
+        )
+        html_by_url = prefetcher.fetch(
+            row["url"]
+            for row, _ in collector.items()
+            if policy.needs_scrape(row.get("content"))
+            and not is_copy(near_dups.get(row["url"]))
+        )
+        bulk_operations = [
+            mode.update_operation(
+                build_document(
+                    row,
+                    None,
+                    FMP_FIELDS,
+                    policy,
+                    html_by_url,
+                    content_store,
+                    near_dups.get(row["url"]),
+                ),
+                article_tickers,
+            )
+            for row, article_tickers in collector.items()
+        ]
+        write_operations(collection, bulk_operations, f"{len(tickers)} tickers")
 
-        logger.info(f"Completed processing for {ticker}")
+    prefetcher.report()
@@ -0,0 +1,203 @@
+"""
+Concurrent article HTML fetching for the news loaders.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+from quantum_trade_utilities.io.grab_html import grab_html
+
+logger = logging.getLogger(__name__)
+
+# Concurrent fetches per domain across the process, overridable with
+# HENDRICKS_HTML_PER_DOMAIN_LIMIT
+DEFAULT_PER_DOMAIN_LIMIT = 4
+
+
+class DomainLimiter:
+    """
+    Thread-safe count of in-flight fetches per domain.
+
+    ``try_acquire`` never blocks; callers keep their own queue of URLs for
+    a full domain and retry after ``wait_for_release``.
+    """
+
+    def __init__(self, per_domain_limit: int):
+        self.per_domain_limit = max(1, int(per_domain_limit))
+        self.releases = 0
+        self._active = defaultdict(int)
+        self._cond = threading.Condition()
+
+    def try_acquire(self, domain: str) -> bool:
+        """Take a slot for ``domain`` if one is free."""
+        with self._cond:
+            if self._active[domain] >= self.per_domain_limit:
+                return False
+            self._active[domain] += 1
+            return True
+
+    def release(self, domain: str):
+        """Free a slot and wake anyone waiting for one."""
+        with self._cond:
+            self._active[domain] -= 1
+            if self._active[domain] <= 0:
+                del self._active[domain]
+            self.releases += 1
+            self._cond.notify_all()
+
+    def wait_for_release(self, seen: int, timeout: float):
+        """Block until a slot is released after ``releases`` was ``seen``."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.releases != seen, timeout)
+
+
+_DOMAIN_LIMITER = None
+_DOMAIN_LIMITER_LOCK = threading.Lock()
+
+
+def get_domain_limiter() -> DomainLimiter:
+    """Return the process-wide per-domain limiter, creating it on first use."""
+    global _DOMAIN_LIMITER
+    with _DOMAIN_LIMITER_LOCK:
+        if _DOMAIN_LIMITER is None:
+            _DOMAIN_LIMITER = DomainLimiter(
+                os.getenv("HENDRICKS_HTML_PER_DOMAIN_LIMIT", DEFAULT_PER_DOMAIN_LIMIT)
+            )
+        return _DOMAIN_LIMITER
+
+
+class HtmlPrefetcher:
+    """
+    Fetch the HTML for every article URL on a page in parallel.
+
+    Total concurrency is bounded by ``max_workers`` and each domain by the
+    process-wide ``get_domain_limiter``, so one slow site cannot take every
+    worker even when several windows load at once. URLs for a domain at its
+    limit wait in a queue rather than on a worker. Each ``fetch`` call waits
+    at most ``timeout`` seconds; URLs that have not finished by then come
+    back as None. Latency is tracked per domain.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 16,
+        timeout: float = 60.0,
+        domain_limiter: DomainLimiter = None,
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.domain_limiter = domain_limiter or get_domain_limiter()
+        self._stats_lock = threading.Lock()
+        self.domain_stats = defaultdict(
+            lambda: {"count": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+
+    def _record(self, domain: str, elapsed_ms: float, failed: bool):
+        with self._stats_lock:
+            stats = self.domain_stats[domain]
+            stats["count"] += 1
+            stats["failures"] += int(failed)
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def _fetch_one(self, domain: str, url: str):
+        start = time.perf_counter()
+        try:
+            html = grab_html(url)
+            failed = html is None
+        except Exception as e:
+            logger.warning(f"Failed to fetch {url}: {e}")
+            html = None
+            failed = True
+        self._record(domain, (time.perf_counter() - start) * 1000, failed)
+        return html
+
+    def _submit(self, executor, domain: str, url: str):
+        future = executor.submit(self._fetch_one, domain, url)
+        # Runs on completion and on cancellation, so the slot is never lost
+        future.add_done_callback(lambda _: self.domain_limiter.release(domain))
+        return future
+
+    def fetch(self, urls) -> dict:
+        """Fetch every distinct URL concurrently and return {url: html}."""
+        unique_urls = list(dict.fromkeys(url for url in urls if url))
+        if not unique_urls:
+            return {}
+
+        queued = defaultdict(deque)
+        for url in unique_urls:
+            queued[urlparse(url).netloc].append(url)
+
+        deadline = time.monotonic() + self.timeout
+        futures = {}
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(unique_urls)),
+            thread_name_prefix="html-prefetch",
+        )
+        try:
+            while queued:
+                seen = self.domain_limiter.releases
+                running = sum(not future.done() for future in futures)
+                for domain in list(queued):
+                    pending = queued[domain]
+                    while (
+                        pending
+                        and running < self.max_workers
+                        and self.domain_limiter.try_acquire(domain)
+                    ):
+                        url = pending.popleft()
+                        futures[self._submit(executor, domain, url)] = url
+                        running += 1
+                    if not pending:
+                        del queued[domain]
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if queued:
+                    self.domain_limiter.wait_for_release(seen, remaining)
+
+            done, _ = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        finally:
+            # Don't block on stragglers; their slots free up when they finish
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if len(done) < len(unique_urls):
+            logger.warning(
+                f"{len(unique_urls) - len(done)} of {len(unique_urls)} "
+                f"article fetches timed out"
+            )
+
+        html_by_url = {url: None for url in unique_urls}
+        for future in done:
+            if not future.cancelled():
+                html_by_url[futures[future]] = future.result()
+        return html_by_url
+
+    def report(self) -> dict:
+        """Per-domain fetch latency summary, also written to the log."""
+        with self._stats_lock:
+            summary = {
+                domain: {
+                    "count": stats["count"],
+                    "failures": stats["failures"],
+                    "mean_ms": round(stats["total_ms"] / stats["count"], 1),
+                    "max_ms": round(stats["max_ms"], 1),
+                }
+                for domain, stats in self.domain_stats.items()
+                if stats["count"]
+            }
+        for domain, stats in sorted(
+            summary.items(), key=lambda kv: kv[1]["mean_ms"], reverse=True
+        ):
+            logger.info(
+                f"HTML fetch {domain}: n={stats['count']} "
+                f"fail={stats['failures']} mean={stats['mean_ms']}ms "
+                f"max={stats['max_ms']}ms"
+            )
+        return summary
@@ -5,9 +5,23 @@ import dotenv
 import pandas as pd
 from hendricks.ingest_news.corp_news_from_alpacaAPI import news_from_alpacaAPI
 from hendricks.ingest_news.corp_news_from_fmpAPI import news_from_fmpAPI
+from hendricks._utils.date_windows import month_windows, run_windows
 
 dotenv.load_dotenv()
 
+# Alpaca returns at most 50 articles per page
+ALPACA_PAGE_SIZE = 50
+# Pages read per ticker and window before the window counts as truncated
+ALPACA_MAX_PAGES_PER_WINDOW = 20
+# Truncated windows are split in half down to this length
+ALPACA_MIN_WINDOW = pd.Timedelta(hours=1)
+# Aim for roughly this many articles for the busiest ticker in each window
+ALPACA_TARGET_WINDOW_ARTICLES = 500
+ALPACA_INITIAL_WINDOW_DAYS = 30
+ALPACA_MAX_WINDOW_DAYS = 366
+
+FMP_ARTICLES_LIMIT = 1000
+
 
 class NewsLoader:
     """
@@ -23,6 +37,12 @@ class NewsLoader:
         source: str = None,
         gridfs_bucket: str = None,
         mongo_db: str = "stocksDB",
+        content_policy: str = None,
+        inline_max_bytes: int = None,
+        storage_mode: str = None,
+        max_workers: int = 4,
+        ticker_batch_size: int = None,
+        near_duplicate_threshold: float = None,
     ):
         self.tickers = tickers
         self.from_date = from_date
@@ -31,123 +51,147 @@ class NewsLoader:
         self.source = source
         self.gridfs_bucket = gridfs_bucket
         self.mongo_db = mongo_db
+        self.content_policy = content_policy
+        self.inline_max_bytes = inline_max_bytes
+        self.storage_mode = storage_mode
+        # Date windows processed in parallel; requests share the provider's rate limit
+        self.max_workers = max(1, int(max_workers or 1))
+        # FMP tickers per request, 1 requests each ticker separately
+        self.ticker_batch_size = ticker_batch_size or 1
+        # MinHash similarity at which syndicated copies are linked, None disables
+        self.near_duplicate_threshold = near_duplicate_threshold
+
+    def _load_alpaca_window(self, window_beg, window_end, tickers=None):
+        """Load one Alpaca window; returns {ticker: (articles, truncated)}."""
+        print(f"Alpaca window {window_beg} to {window_end}")
+        return news_from_alpacaAPI(
+            tickers=tickers or self.tickers,
+            from_date=window_beg.isoformat(),
+            to_date=window_end.isoformat(),
+            articles_limit=ALPACA_PAGE_SIZE,
+            collection_name=self.collection_name,
+            gridfs_bucket=self.gridfs_bucket,
+            mongo_db=self.mongo_db,
+            content_policy=self.content_policy,
+            inline_max_bytes=self.inline_max_bytes,
+            storage_mode=self.storage_mode,
+            near_duplicate_threshold=self.near_duplicate_threshold,
+            max_pages=ALPACA_MAX_PAGES_PER_WINDOW,
+        )
+
+    def _load_alpaca_complete(self, window_beg, window_end, tickers=None):
+        """
+        Load one Alpaca window, then reload each half of it for any ticker
+        whose results were truncated, until every article is covered or the
+        halves reach ALPACA_MIN_WINDOW. Returns the first load's stats.
+        """
+        window_stats = self._load_alpaca_window(window_beg, window_end, tickers) or {}
+        truncated = [ticker for ticker, (_, cut) in window_stats.items() if cut]
+        if truncated and window_end - window_beg > ALPACA_MIN_WINDOW:
+            window_mid = window_beg + (window_end - window_beg) / 2
+            print(
+                f"Splitting Alpaca window {window_beg} to {window_end} for {truncated}"
+            )
+            self._load_alpaca_complete(window_beg, window_mid, truncated)
+            self._load_alpaca_complete(window_mid, window_end, truncated)
+        elif truncated:
+            print(
+                f"Alpaca window {window_beg} to {window_end} truncated for {truncated}"
+            )
+        return window_stats
+
+    def _load_alpaca_adaptive(self):
+        """
+        Load Alpaca news in date windows sized from observed article density.
+
+        Each ticker's window is paged through up to
+        ALPACA_MAX_PAGES_PER_WINDOW pages; a window that hits that cap is
+        split and reloaded, and the next windows are halved. Otherwise the
+        counts are exact and size the next windows to about
+        ALPACA_TARGET_WINDOW_ARTICLES articles for the busiest ticker, so
+        quiet tickers get long windows (few calls). Windows run in waves of
+        ``max_workers``, and each wave sizes the next.
+
+        ``to_date`` is inclusive like the calendar-month windows: a bare date
+        covers that whole day.
+        """
+        from_date = pd.to_datetime(self.from_date).replace(tzinfo=None)
+        to_date = pd.to_datetime(self.to_date).replace(tzinfo=None)
+        if to_date == to_date.normalize():
+            to_date += pd.Timedelta(days=1)
+        # Alpaca's news lags by about 15 minutes, as in news_from_alpacaAPI
+        latest = pd.Timestamp.now(tz="America/New_York").tz_localize(None)
+        to_date = min(to_date, latest - pd.Timedelta(minutes=15))
+        window_days = ALPACA_INITIAL_WINDOW_DAYS
+
+        window_beg = from_date
+        while window_beg < to_date:
+            windows = []
+            while window_beg < to_date and len(windows) < self.max_workers:
+                window_end = min(window_beg + pd.Timedelta(days=window_days), to_date)
+                windows.append((window_beg, window_end))
+                window_beg = window_end
+
+            results = run_windows(
+                self._load_alpaca_complete, windows, max_workers=self.max_workers
+            )
+            stats = [
+                stat
+                for window_stats in results
+                for stat in (window_stats or {}).values()
+            ]
+
+            if any(truncated for _, truncated in stats):
+                # The cap was hit, so the counts understate density
+                window_days /= 2
+            else:
+                # Size the next windows from the busiest ticker's articles per day
+                span_days = max(
+                    (windows[-1][1] - windows[0][0]) / pd.Timedelta(days=1), 1 / 24
+                )
+                busiest = max((articles for articles, _ in stats), default=0)
+                if busiest:
+                    window_days = (
+                        ALPACA_TARGET_WINDOW_ARTICLES
+                        * span_days
+                        / len(windows)
+                        / busiest
+                    )
+                else:
+                    window_days *= 4
+            window_days = min(
+                max(window_days, ALPACA_MIN_WINDOW / pd.Timedelta(days=1)),
+                ALPACA_MAX_WINDOW_DAYS,
+            )
+
+    def _load_fmp_window(self, window_beg, window_end):
+        """Load one calendar-month FMP window."""
+        news_from_fmpAPI(
+            tickers=self.tickers,
+            from_date=window_beg.strftime("%Y-%m-%d"),
+            to_date=window_end.strftime("%Y-%m-%d"),
+            articles_limit=FMP_ARTICLES_LIMIT,
+            collection_name=self.collection_name,
+            gridfs_bucket=self.gridfs_bucket,
+            mongo_db=self.mongo_db,
+            content_policy=self.content_policy,
+            inline_max_bytes=self.inline_max_bytes,
+            storage_mode=self.storage_mode,
+            ticker_batch_size=self.ticker_batch_size,
+            near_duplicate_threshold=self.near_duplicate_threshold,
+        )
 
     # TODO: Incorporate logic from lfd_enum.py and load_fmp_data.py for consistency
     def load_news_data(self):
         """Load news data into MongoDB."""
         if self.source == "alpaca":
             print(f"Fetching data from Alpaca API for {self.tickers}")
-            from_date = pd.to_datetime(self.from_date).replace(tzinfo=None)
-            to_date = pd.to_datetime(self.to_date).replace(tzinfo=None)
-
-            articles_limit = 50
-
-            # Check if dates span different months/years
-            if (to_date.year != from_date.year) or (to_date.month != from_date.month):
-                print("Dates span multiple months, processing by calendar month")
-                # Loop by calendar months
-                loop_mon_beg = from_date
-                while loop_mon_beg <= to_date:
-                    # Get the last day of current month
-                    if loop_mon_beg.month == 12:
-                        loop_mon_end = pd.Timestamp(
-                            year=loop_mon_beg.year + 1, month=1, day=1
-                        ) - pd.Timedelta(days=1)
-                    else:
-                        loop_mon_end = pd.Timestamp(
-                            year=loop_mon_beg.year, month=loop_mon_beg.month + 1, day=1
-                        ) - pd.Timedelta(days=1)
-
-                    # If we're past the to_date, use to_date as the end
-                    loop_mon_end = min(loop_mon_end, to_date)
-
-                    news_from_alpacaAPI(
-                        tickers=self.tickers,
-                        from_date=loop_mon_beg.strftime("%Y-%m-%d"),
-                        to_date=loop_mon_end.strftime("%Y-%m-%d"),
-                        articles_limit=articles_limit,
-                        collection_name=self.collection_name,
-                        gridfs_bucket=self.gridfs_bucket,
-                        mongo_db=self.mongo_db,
-                    )
-
-                    # Move to first day of next month
-                    if loop_mon_end.month == 12:
-                        loop_mon_beg = pd.Timestamp(
-                            year=loop_mon_end.year + 1, month=1, day=1
-                        )
-                    else:
-                        loop_mon_beg = pd.Timestamp(
-                            year=loop_mon_end.year, month=loop_mon_end.month + 1, day=1
-                        )
-            else:
-                print("Dates within same month, processing as single period")
-                news_from_alpacaAPI(
-                    tickers=self.tickers,
-                    from_date=self.from_date,
-                    to_date=self.to_date,
-                    articles_limit=articles_limit,
-                    collection_name=self.collection_name,
-                    gridfs_bucket=self.gridfs_bucket,
-                    mongo_db=self.mongo_db,
-                )
+            self._load_alpaca_adaptive()
         elif self.source == "fmp":
             print(f"Fetching data from FMP API for {self.tickers}")
-            # Convert dates to timezone-naive timestamps
-            from_date = pd.to_datetime(self.from_date).replace(tzinfo=None)
-            to_date = pd.to_datetime(self.to_date).replace(tzinfo=None)
-
-            articles_limit = 1000
-
-            # Check if dates span different months/years
-            if (to_date.year != from_date.year) or (to_date.month != from_date.month):
-                print("Dates span multiple months, processing by calendar month")
-                # Loop by calendar months
-                loop_mon_beg = from_date
-                while loop_mon_beg <= to_date:
-                    # Get the last day of current month
-                    if loop_mon_beg.month == 12:
-                        loop_mon_end = pd.Timestamp(
-                            year=loop_mon_beg.year + 1, month=1, day=1
-                        ) - pd.Timedelta(days=1)
-                    else:
-                        loop_mon_end = pd.Timestamp(
-                            year=loop_mon_beg.year, month=loop_mon_beg.month + 1, day=1
-                        ) - pd.Timedelta(days=1)
-
-                    # If we're past the to_date, use to_date as the end
-                    loop_mon_end = min(loop_mon_end, to_date)
-
-                    news_from_fmpAPI(
-                        tickers=self.tickers,
-                        from_date=loop_mon_beg.strftime("%Y-%m-%d"),
-                        to_date=loop_mon_end.strftime("%Y-%m-%d"),
-                        articles_limit=articles_limit,
-                        collection_name=self.collection_name,
-                        gridfs_bucket=self.gridfs_bucket,
-                        mongo_db=self.mongo_db,
-                    )
-
-                    # Move to first day of next month
-                    if loop_mon_end.month == 12:
-                        loop_mon_beg = pd.Timestamp(
-                            year=loop_mon_end.year + 1, month=1, day=1
-                        )
-                    else:
-                        loop_mon_beg = pd.Timestamp(
-                            year=loop_mon_end.year, month=loop_mon_end.month + 1, day=1
-                        )
-            else:
-                print("Dates within same month, processing as single period")
-                news_from_fmpAPI(
-                    tickers=self.tickers,
-                    from_date=self.from_date,
-                    to_date=self.to_date,
-                    articles_limit=articles_limit,
-                    collection_name=self.collection_name,
-                    gridfs_bucket=self.gridfs_bucket,
-                    mongo_db=self.mongo_db,
-                )
+            windows = month_windows(self.from_date, self.to_date)
+            print(f"Processing {len(windows)} calendar month windows")
+            run_windows(self._load_fmp_window, windows, max_workers=self.max_workers)
         else:
             raise ValueError("Please provide a valid newssource")
 
@@ -0,0 +1,178 @@
+"""
+MinHash/LSH detection of syndicated near-duplicate news articles.
+"""
+
+import re
+import math
+import zlib
+import hashlib
+import logging
+from collections import defaultdict
+from datetime import timezone
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Largest prime below 2**32, so permuted hashes fit in uint32
+_MERSENNE_PRIME = np.uint64(4294967291)
+_TOKEN_RE = re.compile(r"[a-z0-9$]+")
+
+
+def shingles(text: str, size: int = 3) -> set:
+    """Word n-grams of normalized text (the tokens themselves if too short)."""
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if len(tokens) < size:
+        return set(tokens)
+    return {" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _epoch(published) -> float:
+    """Publish time in epoch seconds (naive means UTC, as Mongo returns it)."""
+    try:
+        if published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)
+        return published.timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return math.inf  # Unknown times never win as the original
+
+
+class NearDuplicateIndex:
+    """
+    Flag articles whose headline and summary nearly match an earlier one.
+
+    Signatures are ``num_perm`` MinHash values split into ``bands`` LSH
+    bands. Each document stores its band keys (``lsh_bands``, multikey
+    indexed) and packed signature (``minhash``); candidates sharing a band
+    are confirmed by estimated Jaccard similarity of at least ``threshold``.
+    A copy gets ``canonical_link`` set to the URL of the earliest published
+    match so the loaders can skip scraping and storing its body; an article
+    older than every match it has is kept as an original.
+    """
+
+    def __init__(
+        self,
+        collection,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.collection = collection
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2**31, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 2**31, size=num_perm).astype(np.uint64)
+        # Articles seen this run: band key -> [(link, signature, published)]
+        self._seen = defaultdict(list)
+        self.collection.create_index([("lsh_bands", 1)], background=True)
+
+    def signature(self, headline, summary):
+        """MinHash signature of headline + summary, or None if empty."""
+        text = f"{headline or ''} {summary if isinstance(summary, str) else ''}"
+        grams = shingles(text)
+        if not grams:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(gram.encode()) for gram in grams),
+            dtype=np.uint64,
+            count=len(grams),
+        )
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signature) -> list:
+        """One short hash per LSH band."""
+        return [
+            f"{band}:"
+            + hashlib.blake2b(
+                signature[band * self.rows : (band + 1) * self.rows].tobytes(),
+                digest_size=8,
+            ).hexdigest()
+            for band in range(self.bands)
+        ]
+
+    def _similar(self, signature, other) -> bool:
+        return float(np.mean(signature == other)) >= self.threshold
+
+    def _find_canonical(self, link, signature, keys, published):
+        """Earliest published original this article copies, if any."""
+        matches = {}
+        for key in keys:
+            for seen_link, seen_signature, seen_published in self._seen.get(key, ()):
+                if seen_link != link and self._similar(signature, seen_signature):
+                    matches[seen_link] = seen_published
+
+        candidates = self.collection.find(
+            {
+                "lsh_bands": {"$in": keys},
+                "link": {"$ne": link},
+                "canonical_link": None,
+            },
+            {"link": 1, "minhash": 1, "timestamp": 1, "_id": 0},
+        ).limit(50)
+        for candidate in candidates:
+            stored = candidate.get("minhash")
+            if stored is None:
+                continue
+            if self._similar(signature, np.frombuffer(stored, dtype=np.uint32)):
+                matches[candidate["link"]] = _epoch(candidate.get("timestamp"))
+
+        if not matches:
+            return None
+        canonical_link = min(matches, key=matches.get)
+        # A copy must not predate its original
+        if matches[canonical_link] > published:
+            return None
+        return canonical_link
+
+    def check(self, link: str, headline, summary, published=None) -> dict:
+        """
+        Classify one article, remembering originals for later checks.
+
+        ``published`` is the article's publish time, used to keep the
+        earliest copy as the original.
+
+        Returns the fields to store on its document: ``minhash``,
+        ``lsh_bands`` and ``canonical_link`` (None for an original).
+        """
+        signature = self.signature(headline, summary)
+        if signature is None:
+            return {"minhash": None, "lsh_bands": [], "canonical_link": None}
+
+        keys = self.band_keys(signature)
+        published = _epoch(published)
+        canonical_link = self._find_canonical(link, signature, keys, published)
+        if canonical_link is None:
+            for key in keys:
+                self._seen[key].append((link, signature, published))
+        else:
+            logger.info(f"Near-duplicate of {canonical_link}: {link}")
+
+        return {
+            "minhash": signature.tobytes(),
+            "lsh_bands": keys,
+            "canonical_link": canonical_link,
+        }
+
+    def classify(self, articles) -> dict:
+        """
+        Check (link, headline, summary, published) tuples, oldest first,
+        and return {link: fields}.
+        """
+        results = {}
+        for link, headline, summary, published in sorted(
+            articles, key=lambda article: _epoch(article[3])
+        ):
+            if link not in results:
+                results[link] = self.check(link, headline, summary, published)
+        return results
+
+
+def is_copy(near_dup) -> bool:
+    """Whether a check result marks the article as a near-duplicate."""
+    return bool(near_dup and near_dup.get("canonical_link"))
@@ -0,0 +1,174 @@
+"""
+News documents shared by the Alpaca and FMP loaders.
+"""
+
+from datetime import datetime
+from typing import Callable, NamedTuple
+from zoneinfo import ZoneInfo
+import hashlib
+import logging
+import pandas as pd
+from pymongo.errors import BulkWriteError
+
+from hendricks.ingest_news.near_duplicates import is_copy
+
+logger = logging.getLogger("pymongo")
+
+
+class ArticleFields(NamedTuple):
+    """Where a provider's article rows keep what every news document needs."""
+
+    source: str
+    published: str  # Publish time column, as passed to article_timestamp
+    headline: str
+    summary: str
+    article_source: Callable  # row -> publishing site
+    content_data: Callable  # (row, html) -> body stored inline or in GridFS
+
+
+def article_timestamp(row, ep_timestamp_field: str):
+    """Resolve an article's timestamp in US/Eastern."""
+    if ep_timestamp_field == "today":
+        timestamp = datetime.now(ZoneInfo("America/Chicago"))
+    elif ep_timestamp_field == "year":
+        # Jan 1st of the year
+        timestamp = datetime(
+            int(row["year"]), 1, 1, tzinfo=ZoneInfo("America/New_York")
+        )
+    elif ep_timestamp_field == "timestamp":
+        timestamp = datetime.fromtimestamp(
+            row["timestamp"], tz=ZoneInfo("America/New_York")
+        )
+    else:
+        raw_date = row[ep_timestamp_field]
+        if isinstance(raw_date, str) and len(raw_date.split()) == 1:  # Just a date
+            # Parse the date and explicitly set to midnight EST
+            date_obj = datetime.strptime(raw_date, "%Y-%m-%d").date()
+            timestamp = datetime.combine(
+                date_obj,
+                datetime.min.time(),
+                tzinfo=ZoneInfo("America/New_York"),  # Explicitly EST
+            )
+        else:  # Has time component
+            # Parse with pandas and ensure EST
+            timestamp = pd.to_datetime(raw_date)
+            if timestamp.tzinfo is None:
+                # If no timezone provided, add EST to the datetime object
+                timestamp = timestamp.tz_localize("America/New_York")
+            else:
+                # If it has a timezone, convert to EST
+                timestamp = timestamp.astimezone(ZoneInfo("America/New_York"))
+    return timestamp
+
+
+def build_document(
+    row,
+    ticker,
+    fields: ArticleFields,
+    policy,
+    html_by_url,
+    content_store,
+    near_dup=None,
+):
+    """
+    Build the news document for one article.
+
+    ``ticker`` is the owning symbol in per-ticker mode, or None for an
+    article-centric document (its tickers are merged in by the upsert).
+    ``near_dup`` is the article's near-duplicate check result, if enabled.
+    """
+    # Provider content or scraped page per policy, summary as a last resort
+    html_content = policy.select_html(
+        row.get("content"), html_by_url.get(row["url"]), row[fields.summary]
+    )
+
+    timestamp = article_timestamp(row, fields.published)
+
+    created_at = datetime.now(ZoneInfo("America/Chicago"))
+
+    # Create a hash of the actual estimate values to detect changes
+    feature_values = {
+        "headline": row[fields.headline],
+        "link": row["url"],
+    }
+    feature_hash = hashlib.sha256(str(feature_values).encode()).hexdigest()
+
+    # Create unique_id when there isn't a good option in response
+    f1 = ticker or ""
+    f2 = row[fields.published]
+    f3 = row[fields.headline]
+    f4 = row[fields.summary]
+    f5 = row["url"]
+
+    # Create hash of f1, f2, f3, f4
+    unique_id = hashlib.sha256(f"{f1}{f2}{f3}{f4}{f5}".encode()).hexdigest()
+
+    if is_copy(near_dup):
+        # Syndicated copy: the canonical article already holds the body. Leave
+        # the content fields out, so a body stored by an earlier run survives
+        content_fields = {}
+    else:
+        # Embed small bodies, store large ones in GridFS (deduplicated by hash)
+        content_fields = content_store.store(
+            fields.content_data(row, html_content),
+            filename=row["url"],
+            ticker=ticker,
+            source=fields.source,
+        )
+
+    # Streamlined main document
+    document = {
+        "unique_id": unique_id,
+        "timestamp": timestamp,
+        ##########################################
+        ##########################################
+        "article_source": fields.article_source(row),
+        **feature_values,
+        "feature_hash": feature_hash,
+        ##########################################
+        ##########################################
+        "source": fields.source,
+        "created_at": created_at,
+        **content_fields,  # Inline body or reference to GridFS content
+    }
+    if ticker is not None:
+        document["ticker"] = ticker
+    if near_dup is not None:
+        document.update(near_dup)
+    return document
+
+
+def classify(near_dup_index, rows, fields: ArticleFields) -> dict:
+    """Near-duplicate check results by URL, empty when detection is off."""
+    if near_dup_index is None:
+        return {}
+    return near_dup_index.classify(
+        (
+            row["url"],
+            row[fields.headline],
+            row[fields.summary],
+            article_timestamp(row, fields.published),
+        )
+        for row in rows
+    )
+
+
+def write_operations(collection, bulk_operations, label):
+    """Execute a batch of upserts, ignoring duplicate key errors."""
+    if not bulk_operations:
+        return
+    try:
+        result = collection.bulk_write(bulk_operations, ordered=False)
+        logger.info(f"{label}: Processed {len(bulk_operations)} items")
+        logger.info(
+            f"Inserted: {result.upserted_count}, Modified: {result.modified_count}"
+        )
+    except BulkWriteError as bwe:
+        # Filter out duplicate key errors (code 11000)
+        non_duplicate_errors = [
+            error for error in bwe.details["writeErrors"] if error["code"] != 11000
+        ]
+
+        # Only log if there are non-duplicate errors
+        if non_duplicate_errors:
+            logger.warning(f"Some writes failed for {label}: {non_duplicate_errors}")
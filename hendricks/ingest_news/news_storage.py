@@ -0,0 +1,230 @@
+"""
+Content-addressed GridFS storage for news article bodies.
+"""
+
+from datetime import datetime, timedelta, timezone
+import hashlib
+import logging
+import time
+from gridfs import GridFS
+
+from quantum_trade_utilities.data.mongo_conn import mongo_conn
+
+from hendricks._utils.payload_codec import canonical_json, decode_payload, pack_json
+
+logger = logging.getLogger(__name__)
+
+# Compressed bodies up to this size are embedded in the news document
+DEFAULT_INLINE_MAX_BYTES = 16 * 1024
+# Reused GridFS files are re-stamped at most this often, keeping them out of GC
+TOUCH_INTERVAL_SECONDS = 600
+
+
+def content_hash(raw: bytes) -> str:
+    """SHA-256 of an article body's canonical JSON."""
+    return hashlib.sha256(raw).hexdigest()
+
+
+class NewsContentStore:
+    """
+    Store article bodies in GridFS keyed by their content hash.
+
+    Bodies are written with the versioned, compressed payload codec. An
+    identical body (a reloaded article, or one tagged with several tickers)
+    reuses the existing file instead of writing a new one. Bodies whose
+    compressed size is at most ``inline_max_bytes`` skip GridFS entirely and
+    are embedded in the news document.
+
+    Reusing a file stamps its ``last_referenced_at``, so ``gc_news_content``
+    doesn't sweep an old orphan that a document is about to reference again.
+    """
+
+    def __init__(
+        self,
+        db,
+        gridfs_bucket: str = None,
+        inline_max_bytes: int = DEFAULT_INLINE_MAX_BYTES,
+    ):
+        self.inline_max_bytes = (
+            DEFAULT_INLINE_MAX_BYTES if inline_max_bytes is None else inline_max_bytes
+        )
+        self.bucket = gridfs_bucket or "fs"
+        self.fs = GridFS(db, collection=self.bucket)
+        self.files = db[f"{self.bucket}.files"]
+        self.files.create_index([("content_hash", 1)], background=True)
+        # Hashes already resolved during this run: (content_id, last stamped)
+        self._known = {}
+
+    def _write(self, digest: str, payload: bytes, metadata: dict):
+        """Return the GridFS id for a hash, writing the payload only if new."""
+        content_id, stamped = self._known.get(digest, (None, None))
+        if content_id is None:
+            existing = self.files.find_one({"content_hash": digest}, {"_id": 1})
+            if existing is not None:
+                content_id = existing["_id"]
+                self._touch(content_id)
+            else:
+                content_id = self.fs.put(payload, content_hash=digest, **metadata)
+        elif time.monotonic() - stamped >= TOUCH_INTERVAL_SECONDS:
+            self._touch(content_id)
+        else:
+            return content_id
+        self._known[digest] = (content_id, time.monotonic())
+        return content_id
+
+    def _touch(self, content_id):
+        """Mark a reused file as referenced now."""
+        self.files.update_one(
+            {"_id": content_id},
+            {"$set": {"last_referenced_at": datetime.now(timezone.utc)}},
+        )
+
+    def put(self, content_data: dict, **metadata):
+        """Return (content_id, content_hash), writing the body only if new."""
+        raw = canonical_json(content_data)
+        digest = content_hash(raw)
+        return self._write(digest, pack_json(raw), metadata), digest
+
+    def store(self, content_data: dict, **metadata) -> dict:
+        """
+        Store a body inline or in GridFS and return the document fields
+        (content_id, content_hash, content_inline) that reference it.
+        """
+        raw = canonical_json(content_data)
+        digest = content_hash(raw)
+        payload = pack_json(raw)
+        if len(payload) <= self.inline_max_bytes:
+            return {
+                "content_id": None,
+                "content_hash": digest,
+                "content_inline": payload,
+            }
+
+        return {
+            "content_id": self._write(digest, payload, metadata),
+            "content_hash": digest,
+            "content_inline": None,
+        }
+
+    def get(self, content_id):
+        """Read and decode a stored body."""
+        return decode_payload(self.fs.get(content_id).read())
+
+
+def read_news_content(
+    document,
+    gridfs_bucket: str = None,
+    mongo_db: str = "stocksDB",
+    db=None,
+):
+    """
+    Decode the body of a news article.
+
+    Accepts a news document (inline bodies are decoded without another
+    round-trip) or a bare GridFS content_id.
+    """
+    if isinstance(document, dict):
+        if document.get("content_inline"):
+            return decode_payload(bytes(document["content_inline"]))
+        content_id = document.get("content_id")
+        if content_id is None:
+            return None
+    else:
+        content_id = document
+
+    if db is None:
+        db = mongo_conn(mongo_db=mongo_db)
+    fs = GridFS(db, collection=gridfs_bucket or "fs")
+    return decode_payload(fs.get(content_id).read())
+
+
+def gc_news_content(
+    collection_names: list,
+    gridfs_bucket: str = None,
+    mongo_db: str = "stocksDB",
+    min_age_hours: float = 1.0,
+    dry_run: bool = False,
+    allow_default_bucket: bool = False,
+):
+    """
+    Delete GridFS files no news document references.
+
+    ``collection_names`` must list every collection whose documents point
+    into the bucket (e.g. both the per-ticker and the article-mode news
+    collections); a file referenced from anywhere else would be deleted.
+    The shared default "fs" bucket is refused unless ``allow_default_bucket``
+    is set.
+
+    Each candidate is checked with an indexed ``$lookup`` per collection
+    rather than by loading every referenced id, and checked again right
+    before it is deleted. Files uploaded or reused within ``min_age_hours``
+    are kept, so a loader that has written or reused a body but not yet
+    upserted its document is never swept.
+    """
+    if isinstance(collection_names, str):
+        collection_names = [collection_names]
+    if not collection_names:
+        raise ValueError("collection_names must list every collection using the bucket")
+    bucket = gridfs_bucket or "fs"
+    if bucket == "fs" and not allow_default_bucket:
+        raise ValueError(
+            "Refusing to sweep the default 'fs' bucket, which other collections "
+            "may share; pass its bucket name or allow_default_bucket"
+        )
+
+    db = mongo_conn(mongo_db=mongo_db)
+    fs = GridFS(db, collection=bucket)
+    for collection_name in collection_names:
+        db[collection_name].create_index(
+            [("content_id", 1)],
+            partialFilterExpression={"content_id": {"$type": "objectId"}},
+            background=True,
+        )
+
+    def referenced(file_id) -> bool:
+        return any(
+            db[collection_name].find_one({"content_id": file_id}, {"_id": 1})
+            is not None
+            for collection_name in collection_names
+        )
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=min_age_hours)
+    pipeline = [
+        {
+            "$match": {
+                "uploadDate": {"$lt": cutoff},
+                "$or": [
+                    {"last_referenced_at": {"$exists": False}},
+                    {"last_referenced_at": {"$lt": cutoff}},
+                ],
+            }
+        },
+        {"$project": {"_id": 1}},
+    ]
+    for index, collection_name in enumerate(collection_names):
+        pipeline += [
+            {
+                "$lookup": {
+                    "from": collection_name,
+                    "localField": "_id",
+                    "foreignField": "content_id",
+                    "as": f"ref_{index}",
+                }
+            },
+            {"$match": {f"ref_{index}": {"$size": 0}}},
+            {"$project": {"_id": 1}},
+        ]
+
+    orphaned = 0
+    for file_doc in db[f"{bucket}.files"].aggregate(pipeline):
+        # A document may have started referencing it since the lookup
+        if dry_run or not referenced(file_doc["_id"]):
+            orphaned += 1
+            if not dry_run:
+                fs.delete(file_doc["_id"])
+
+    logger.info(
+        f"GridFS sweep of {bucket} against {collection_names}: "
+        f"{orphaned} orphaned{' (dry run)' if dry_run else ' deleted'}"
+    )
+    return {"orphaned": orphaned}
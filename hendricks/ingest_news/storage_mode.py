@@ -0,0 +1,86 @@
+"""
+Enum for how the news loaders lay out articles in MongoDB.
+"""
+
+from enum import Enum
+
+from pymongo import UpdateOne
+
+
+class StorageMode(Enum):
+    """
+    Enum for news document layouts.
+    """
+
+    # One document per (article, ticker), the original layout
+    PER_TICKER = "per_ticker"
+    # One document per article with a multikey `tickers` array
+    ARTICLE = "article"
+
+    @classmethod
+    def get_by_name(cls, name: str = None) -> "StorageMode":
+        """Get storage mode by name, defaulting to per_ticker."""
+        if name is None:
+            return cls.PER_TICKER
+        try:
+            return cls(name)
+        except ValueError:
+            raise ValueError(
+                f"Unsupported storage mode: {name}. "
+                f"Use one of {[mode.value for mode in cls]}"
+            )
+
+    def create_indexes(self, collection):
+        """Create the indexes specific to this layout."""
+        if self is StorageMode.ARTICLE:
+            # Multikey indexes over the tickers array
+            collection.create_index([("tickers", 1)])
+            collection.create_index([("tickers", 1), ("timestamp", -1)])
+            # Partial so it can coexist with per-ticker documents
+            collection.create_index(
+                [("unique_id", 1)],
+                unique=True,
+                partialFilterExpression={"tickers": {"$exists": True}},
+                background=True,
+            )
+
+    def update_operation(self, document: dict, tickers: list = None) -> UpdateOne:
+        """Upsert for an article-centric document, merging its tickers."""
+        return UpdateOne(
+            {"unique_id": document["unique_id"]},
+            {
+                "$set": document,
+                "$addToSet": {"tickers": {"$each": sorted(tickers or [])}},
+            },
+            upsert=True,
+        )
+
+
+class ArticleCollector:
+    """
+    Deduplicate articles across the per-ticker fetch loop.
+
+    Every article is kept once, keyed by URL, together with every ticker it
+    was returned for or tagged with, so it is scraped and written once.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._tickers = {}
+
+    def add(self, key: str, row, tickers) -> bool:
+        """Record an article; returns True the first time a key is seen."""
+        first_seen = key not in self._rows
+        if first_seen:
+            self._rows[key] = row
+            self._tickers[key] = set()
+        self._tickers[key].update(t for t in tickers if t)
+        return first_seen
+
+    def __len__(self):
+        return len(self._rows)
+
+    def items(self):
+        """Yield (row, sorted tickers) per distinct article."""
+        for key, row in self._rows.items():
+            yield row, sorted(self._tickers[key])
@@ -116,12 +116,13 @@ class DataLoader:
 
         return None
 
-    def load_stream_doc(self, stream_list):
+    def load_stream_doc(self, stream_list, metrics=None):
         """Process and store streaming data into MongoDB."""
         stream_from_alpacaAPI(
             stream_data=stream_list,
             collection_name=self.collection_name,
             creds_file_path=self.creds_file_path,
             mongo_db=self.mongo_db,
+            metrics=metrics,
         )
         print("Data imported successfully!")
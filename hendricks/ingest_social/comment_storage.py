@@ -0,0 +1,246 @@
+"""
+Layouts for Reddit comments in MongoDB: one document per comment, or
+bucketed thread documents holding each post's comments as arrays.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from enum import Enum
+from zoneinfo import ZoneInfo
+
+from pymongo import UpdateOne
+from quantum_trade_utilities.data.mongo_conn import mongo_conn
+
+from hendricks._utils.bulk_writer import BufferedBulkWriter
+
+logger = logging.getLogger(__name__)
+
+# Comment row field -> array it is stored in on a thread document
+THREAD_FIELDS = {
+    "comment_id": "comment_ids",
+    "parent_id": "parent_ids",
+    "depth": "depths",
+    "author": "authors",
+    "body": "bodies",
+    "created_utc": "created_utcs",
+    "score": "scores",
+}
+
+# Comments per thread document; large threads span several buckets
+DEFAULT_BUCKET_SIZE = 500
+
+
+class CommentStorage(Enum):
+    """
+    Enum for comment document layouts.
+    """
+
+    # One document per (comment, ticker) in <collection>Comments, the original
+    DOCUMENTS = "documents"
+    # Bucketed documents per post in <collection>Threads
+    THREADS = "threads"
+
+    @classmethod
+    def get_by_name(cls, name: str = None) -> "CommentStorage":
+        """Get comment storage by name, defaulting to documents."""
+        if name is None:
+            return cls.DOCUMENTS
+        try:
+            return cls(name)
+        except ValueError:
+            raise ValueError(
+                f"Unsupported comment storage: {name}. "
+                f"Use one of {[storage.value for storage in cls]}"
+            )
+
+
+class ThreadStore:
+    """
+    Comment trees stored as compact, bucketed thread documents.
+
+    Each document holds up to ``bucket_size`` comments of one post as
+    parallel arrays (see ``THREAD_FIELDS``), keyed by (post_id, bucket),
+    with the tickers the post was crawled for in a multikey ``tickers``
+    array. Updates are incremental: new comments are pushed onto the last
+    bucket, changed scores are set in place, and nothing else is rewritten.
+
+    Comment positions are loaded once per post and kept for the run, so
+    operations for one post must all go through the same store. They are
+    buffered on ``writer``, which writes in order. When an ordered batch
+    fails part-way, every post it cut short has its remaining buffered
+    operations dropped and its positions reloaded from Mongo on next use.
+    """
+
+    def __init__(
+        self,
+        db,
+        collection_name: str,
+        bucket_size: int = DEFAULT_BUCKET_SIZE,
+        batch_size: int = None,
+        verbose: bool = False,
+    ):
+        self.collection = db[f"{collection_name}Threads"]
+        self.collection.create_index([("post_id", 1), ("bucket", 1)], unique=True)
+        self.collection.create_index([("tickers", 1), ("last_comment_utc", -1)])
+        self.bucket_size = bucket_size
+        # Pushes and in-place score sets depend on each other's order
+        self.writer = BufferedBulkWriter(
+            self.collection,
+            batch_size=batch_size,
+            ordered=True,
+            on_write_error=self._on_write_error,
+            verbose=verbose,
+        )
+        self._threads = {}
+        # Posts whose cached positions no longer match Mongo
+        self._stale = set()
+        self._lock = threading.Lock()
+
+    def _on_write_error(self, batch: list, error):
+        """Forget posts whose writes an ordered batch skipped."""
+        first_failed = error.details["writeErrors"][0]["index"]
+        # pymongo keeps an operation's filter private; every one here has post_id
+        affected = {operation._filter["post_id"] for operation in batch[first_failed:]}
+        # Later operations for these posts assume the skipped ones were applied
+        dropped = self.writer.discard(
+            lambda operation: operation._filter["post_id"] in affected
+        )
+        self._stale.update(affected)
+        logger.warning(
+            f"Reloading threads {sorted(affected)} after a failed write; "
+            f"dropped {dropped} buffered operations for them"
+        )
+
+    def _thread_state(self, post_id) -> dict:
+        """Positions, scores, bucket sizes and tickers of a stored thread."""
+        if post_id in self._stale:
+            self._stale.discard(post_id)
+            self._threads.pop(post_id, None)
+        state = self._threads.get(post_id)
+        if state is not None:
+            return state
+
+        state = {"positions": {}, "scores": {}, "sizes": [], "tickers": set()}
+        for doc in self.collection.find(
+            {"post_id": post_id},
+            {"bucket": 1, "comment_ids": 1, "scores": 1, "tickers": 1, "_id": 0},
+        ).sort("bucket", 1):
+            bucket = doc["bucket"]
+            comment_ids = doc.get("comment_ids", [])
+            for index, (comment_id, score) in enumerate(
+                zip(comment_ids, doc.get("scores", []))
+            ):
+                state["positions"][comment_id] = (bucket, index)
+                state["scores"][comment_id] = score
+            state["sizes"].append(len(comment_ids))
+            state["tickers"].update(doc.get("tickers", []))
+        self._threads[post_id] = state
+        return state
+
+    def store(self, post_id, post_UID, subreddit, ticker, comments: list) -> int:
+        """
+        Buffer the writes that bring a post's thread up to date with
+        ``comments`` (rows as built by ``load_reddit_comments``).
+        """
+        with self._lock:
+            state = self._thread_state(post_id)
+            score_sets = defaultdict(dict)
+            pushes = defaultdict(list)
+
+            for row in comments:
+                comment_id = row["comment_id"]
+                position = state["positions"].get(comment_id)
+                if position is not None:
+                    if state["scores"][comment_id] != row["score"]:
+                        bucket, index = position
+                        score_sets[bucket][f"scores.{index}"] = row["score"]
+                        state["scores"][comment_id] = row["score"]
+                    continue
+
+                # Append to the last bucket, opening a new one when it's full
+                sizes = state["sizes"]
+                if not sizes or sizes[-1] >= self.bucket_size:
+                    sizes.append(0)
+                bucket = len(sizes) - 1
+                state["positions"][comment_id] = (bucket, sizes[bucket])
+                state["scores"][comment_id] = row["score"]
+                sizes[bucket] += 1
+                pushes[bucket].append(row)
+
+            new_ticker = ticker not in state["tickers"]
+            state["tickers"].add(ticker)
+
+            operations = []
+            now = datetime.now(ZoneInfo("UTC"))
+            for bucket in range(len(state["sizes"])):
+                update = {}
+                rows = pushes.get(bucket)
+                if rows:
+                    update["$push"] = {
+                        array: {"$each": [row[field] for row in rows]}
+                        for field, array in THREAD_FIELDS.items()
+                    }
+                    update["$inc"] = {"count": len(rows)}
+                    update["$max"] = {
+                        "last_comment_utc": max(row["created_utc"] for row in rows)
+                    }
+                if new_ticker:
+                    update["$addToSet"] = {"tickers": ticker}
+                if update:
+                    update["$set"] = {
+                        "post_UID": post_UID,
+                        "subreddit": subreddit,
+                        "updated_at": now,
+                    }
+                    operations.append(
+                        UpdateOne(
+                            {"post_id": post_id, "bucket": bucket}, update, upsert=True
+                        )
+                    )
+                # A separate update, since it can't share a path with the $push
+                if score_sets.get(bucket):
+                    operations.append(
+                        UpdateOne(
+                            {"post_id": post_id, "bucket": bucket},
+                            {"$set": score_sets[bucket]},
+                        )
+                    )
+
+            self.writer.extend(operations)
+        return len(comments)
+
+    def read(self, post_id) -> list:
+        """A post's comment rows, in stored order, in one query."""
+        return thread_rows(self.collection, post_id)
+
+
+def thread_rows(collection, post_id) -> list:
+    """Unpack every bucket of a post's thread into comment rows."""
+    rows = []
+    for doc in collection.find(
+        {"post_id": post_id},
+        {"_id": 0, "bucket": 1, **{array: 1 for array in THREAD_FIELDS.values()}},
+    ).sort("bucket", 1):
+        columns = [doc.get(array, []) for array in THREAD_FIELDS.values()]
+        rows.extend(dict(zip(THREAD_FIELDS, values)) for values in zip(*columns))
+    return rows
+
+
+def read_reddit_thread(
+    post_id,
+    collection_name: str = "rawSocial",
+    mongo_db: str = "socialDB",
+    db=None,
+):
+    """
+    Read a post's comment thread stored with ``comment_storage="threads"``.
+
+    Returns comment rows (comment_id, parent_id, depth, author, body,
+    created_utc, score) in the order they were first stored; ``parent_id``
+    rebuilds the tree.
+    """
+    if db is None:
+        db = mongo_conn(mongo_db=mongo_db)
+    return thread_rows(db[f"{collection_name}Threads"], post_id)
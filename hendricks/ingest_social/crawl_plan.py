@@ -0,0 +1,123 @@
+"""
+Explicit (ticker, subreddit, mode) task lists for Reddit crawls.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+from hendricks.ingest_social.reddit_client import get_reddit_client
+
+# Task modes: search a subreddit for one ticker, read a ticker's own
+# subreddit in full, or read a subreddit once and tag every ticker
+SEARCH = "search"
+NEW = "new"
+SCAN = "scan"
+
+# Re-check subreddits after this long, they are created and banned over time
+DEFAULT_MAX_AGE_DAYS = 7
+
+
+class CrawlTask(NamedTuple):
+    """One listing-level unit of crawl work."""
+
+    ticker: str  # None for scan tasks
+    subreddit: str
+    mode: str
+
+
+class SubredditDirectory:
+    """
+    Cached answers to "does r/<name> exist and can we read it?".
+
+    Stored in ``<collection_name>Subreddits`` and loaded once per run, so
+    each name costs at most one request every ``max_age_days``.
+    """
+
+    def __init__(
+        self,
+        db,
+        collection_name: str,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+    ):
+        self.collection = db[f"{collection_name}Subreddits"]
+        self.collection.create_index([("name", 1)], unique=True)
+        fresh_after = datetime.now(ZoneInfo("UTC")) - timedelta(days=max_age_days)
+        self._exists = {
+            doc["name"]: doc["exists"]
+            for doc in self.collection.find(
+                {"checked_at": {"$gte": fresh_after}}, {"_id": 0}
+            )
+        }
+
+    @staticmethod
+    def _check(name: str) -> bool:
+        """Fetch the subreddit; missing, banned and private ones all raise."""
+        try:
+            # display_name is known without a request, created_utc is not
+            _ = get_reddit_client().subreddit(name).created_utc
+            return True
+        except Exception:
+            return False
+
+    def resolve(self, names: list, max_workers: int = 1) -> dict:
+        """Existence of each name, checking only the ones not cached."""
+        unknown = list(
+            dict.fromkeys(
+                name.lower() for name in names if name.lower() not in self._exists
+            )
+        )
+        if max_workers <= 1 or len(unknown) <= 1:
+            found = [self._check(name) for name in unknown]
+        else:
+            # Each worker checks on its own thread's client
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(unknown)),
+                thread_name_prefix="reddit-plan",
+            ) as executor:
+                found = list(executor.map(self._check, unknown))
+
+        now = datetime.now(ZoneInfo("UTC"))
+        for name, exists in zip(unknown, found):
+            self._exists[name] = exists
+            self.collection.update_one(
+                {"name": name},
+                {"$set": {"exists": exists, "checked_at": now}},
+                upsert=True,
+            )
+        return {name: self._exists[name.lower()] for name in names}
+
+
+def build_crawl_plan(
+    tickers: list,
+    subreddits: list,
+    crawl_mode: str = "search",
+    directory: SubredditDirectory = None,
+    max_workers: int = 1,
+) -> list:
+    """
+    Every listing a crawl will read, before any is read.
+
+    In scan mode that is one task per subreddit. In search mode each ticker
+    searches the configured subreddits and, when one exists, reads its own
+    subreddit in full; no ticker ever sees another ticker's subreddit, so
+    the plan grows linearly with tickers. Without a ``directory`` ticker
+    subreddits aren't looked up.
+    """
+    subreddits = list(dict.fromkeys(subreddits or []))
+    if crawl_mode == SCAN:
+        return [CrawlTask(None, sub, SCAN) for sub in subreddits]
+
+    tickers = list(dict.fromkeys(tickers or []))
+    dedicated = directory.resolve(tickers, max_workers=max_workers) if directory else {}
+
+    tasks = []
+    for ticker in tickers:
+        own = ticker.upper()
+        for sub in subreddits:
+            # A configured subreddit named after the ticker is read in full
+            tasks.append(CrawlTask(ticker, sub, NEW if sub.upper() == own else SEARCH))
+        if dedicated.get(ticker) and own not in {sub.upper() for sub in subreddits}:
+            tasks.append(CrawlTask(ticker, ticker, NEW))
+    return tasks
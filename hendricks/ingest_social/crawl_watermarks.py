@@ -0,0 +1,85 @@
+"""
+Per (subreddit, ticker, query) high-water marks for incremental Reddit crawls.
+"""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from pymongo import ASCENDING
+
+# Re-read this far behind the watermark so recent scores and counts refresh
+DEFAULT_OVERLAP_SECONDS = 6 * 3600
+
+
+class CrawlWatermarks:
+    """
+    Newest ``created_utc`` ingested for each (subreddit, ticker, query).
+
+    Stored in ``<collection_name>Watermarks`` and loaded once per run.
+    Listings are sorted newest first, so a crawl can stop as soon as it
+    passes ``watermark - overlap_seconds``.
+    """
+
+    def __init__(
+        self,
+        db,
+        collection_name: str,
+        overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    ):
+        self.collection = db[f"{collection_name}Watermarks"]
+        self.collection.create_index(
+            [("subreddit", ASCENDING), ("ticker", ASCENDING), ("query", ASCENDING)],
+            unique=True,
+        )
+        self.overlap_seconds = overlap_seconds
+        self._marks = {
+            (doc["subreddit"], doc["ticker"], doc["query"]): doc["newest_created_utc"]
+            for doc in self.collection.find({}, {"_id": 0})
+        }
+
+    def cutoff(self, subreddit: str, ticker: str, query: str):
+        """Oldest created_utc still worth reading, or None for a full crawl."""
+        newest = self._marks.get((subreddit.lower(), ticker, query))
+        if newest is None:
+            return None
+        return newest - self.overlap_seconds
+
+    def advance(self, subreddit: str, ticker: str, query: str, newest: float):
+        """Record a completed listing; the mark only ever moves forward."""
+        if newest is None:
+            return
+        key = (subreddit.lower(), ticker, query)
+        if newest <= self._marks.get(key, float("-inf")):
+            return
+        self._marks[key] = newest
+        self.collection.update_one(
+            {"subreddit": key[0], "ticker": ticker, "query": query},
+            {
+                "$max": {"newest_created_utc": newest},
+                "$set": {"updated_at": datetime.now(ZoneInfo("UTC"))},
+            },
+            upsert=True,
+        )
+
+
+class WatermarkedListing:
+    """
+    Iterate a newest-first listing until it passes ``cutoff``, tracking
+    the newest ``created_utc`` seen.
+    """
+
+    def __init__(self, submissions, cutoff: float = None):
+        self.submissions = submissions
+        self.cutoff = cutoff
+        self.newest = None
+        self.reached_cutoff = False
+
+    def __iter__(self):
+        for submission in self.submissions:
+            created = submission.created_utc
+            if self.cutoff is not None and created < self.cutoff:
+                self.reached_cutoff = True
+                return
+            if self.newest is None or created > self.newest:
+                self.newest = created
+            yield submission
@@ -4,6 +4,7 @@ Load social media data into MongoDB.
 
 import logging
 from hendricks.ingest_social.lsd_enum import SocialEndpoint
+from hendricks.ingest_social.social_stream_from_reddit import start_social_stream
 
 
 class SocialLoader:
@@ -23,6 +24,11 @@ class SocialLoader:
         comment_depth: int = 100,
         keywords: dict = None,
         target_endpoint: str = "reddit",
+        use_watermarks: bool = True,
+        crawl_mode: str = "search",  # 'search' per ticker or 'scan' subreddits once
+        write_batch_size: int = 1000,
+        max_workers: int = 1,
+        comment_storage: str = None,  # 'documents' (default) or 'threads'
     ):
         self.tickers = tickers
         self.collection_name = collection_name
@@ -33,6 +39,14 @@ class SocialLoader:
         self.comment_depth = comment_depth
         self.keywords = keywords
         self.target_endpoint = target_endpoint
+        # Stop each listing at what earlier runs already ingested
+        self.use_watermarks = use_watermarks
+        self.crawl_mode = crawl_mode
+        # Operations per bulk_write to the posts and comments collections
+        self.write_batch_size = write_batch_size
+        # Concurrent crawl workers, all paced by the shared Reddit rate limiter
+        self.max_workers = max_workers
+        self.comment_storage = comment_storage
 
     def load_data(self):
         """Load social media data into MongoDB."""
@@ -44,6 +58,9 @@ class SocialLoader:
         if not endpoint:
             raise ValueError(f"Unsupported social endpoint: {self.source}")
 
+        if self.reddit_load == "live":
+            return self.start_stream(endpoint)
+
         handler_function = endpoint.function
 
         # Direct call to handler function
@@ -57,7 +74,32 @@ class SocialLoader:
             comment_depth=self.comment_depth,
             keywords=self.keywords,
             target_endpoint=self.target_endpoint,
+            use_watermarks=self.use_watermarks,
+            crawl_mode=self.crawl_mode,
+            write_batch_size=self.write_batch_size,
+            max_workers=self.max_workers,
+            comment_storage=self.comment_storage,
         )
 
         logging.info(f"Completed processing for {self.tickers}")
         return None
+
+    def start_stream(self, endpoint):
+        """Start the endpoint's live stream in the background."""
+        if not endpoint.supports_streaming:
+            raise ValueError(f"Endpoint {self.source} does not support streaming")
+
+        started = start_social_stream(
+            f"{self.source}:{self.collection_name}",
+            endpoint.stream_function,
+            tickers=self.tickers,
+            collection_name=self.collection_name,
+            subreddits=self.subreddits,
+            mongo_db=self.mongo_db,
+            keywords=self.keywords,
+        )
+        if started:
+            logging.info(f"Started live {self.source} stream for {self.tickers}")
+        else:
+            logging.info(f"Live {self.source} stream already running")
+        return None
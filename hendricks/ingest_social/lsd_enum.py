@@ -4,6 +4,9 @@ Enum for social media endpoints and their corresponding handler functions.
 
 from enum import Enum
 from hendricks.ingest_social.social_posts_from_reddit import socialPosts_from_reddit
+from hendricks.ingest_social.social_stream_from_reddit import (
+    socialStream_from_reddit,
+)
 
 
 class SocialEndpoint(Enum):
@@ -15,7 +18,9 @@ class SocialEndpoint(Enum):
     REDDIT_POSTS = {
         "endpoint": "reddit",
         "function": socialPosts_from_reddit,
+        "stream_function": socialStream_from_reddit,
         "supports_streaming": True,
+        "rate_limit": 100,  # OAuth requests per minute
         "description": "Reddit posts and comments",
     }
 
@@ -0,0 +1,99 @@
+"""
+Aho-Corasick extraction of ticker mentions from social text.
+"""
+
+from collections import deque
+
+# Pattern kinds: bare tickers must match in upper case, the rest ignore case
+BARE_TICKER = "ticker"
+CASHTAG = "cashtag"
+KEYWORD = "keyword"
+
+
+class MentionExtractor:
+    """
+    One automaton over every ticker, ``$TICKER`` form and keyword.
+
+    ``extract`` scans a text once, in time linear in its length plus the
+    number of matches, and returns every ticker mentioned. Matches must sit
+    on word boundaries; bare tickers must also be written in upper case so
+    that e.g. ``F`` or ``ALL`` don't match ordinary words.
+    """
+
+    def __init__(self, tickers: list, keywords: dict = None):
+        # Trie as parallel lists: transitions, failure links, outputs
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for ticker in tickers:
+            # Same terms the search crawler uses: ticker, $ticker, keywords
+            terms = [ticker, f"${ticker}", *((keywords or {}).get(ticker) or [])]
+            for term in terms:
+                if term == ticker:
+                    kind = BARE_TICKER
+                elif term.upper() == f"${ticker.upper()}":
+                    kind = CASHTAG
+                else:
+                    kind = KEYWORD
+                self._add(term.lower(), (ticker, kind, term))
+        self._build()
+
+    def _add(self, pattern: str, output):
+        if not pattern:
+            return
+        node = 0
+        for char in pattern:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), output))
+
+    def _build(self):
+        """Breadth-first pass setting failure links and merged outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    @staticmethod
+    def _is_boundary(text: str, index: int) -> bool:
+        return index < 0 or index >= len(text) or not text[index].isalnum()
+
+    def extract(self, text: str) -> list:
+        """Tickers mentioned in ``text``, in order of first mention."""
+        if not text:
+            return []
+        found = {}
+        lowered = text.lower()
+        node = 0
+        for end, char in enumerate(lowered):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, (ticker, kind, term) in self._out[node]:
+                if ticker in found:
+                    continue
+                start = end - length + 1
+                if not (
+                    self._is_boundary(text, start - 1)
+                    and self._is_boundary(text, end + 1)
+                ):
+                    continue
+                if kind == BARE_TICKER:
+                    if text[start : end + 1] != term or text[start - 1 : start] == "$":
+                        continue
+                found[ticker] = start
+        return sorted(found, key=found.get)
@@ -0,0 +1,137 @@
+"""
+Shared, authenticated PRAW client for the Reddit pipeline.
+"""
+
+import threading
+
+import praw
+import prawcore
+
+from quantum_trade_utilities.data.load_credentials import load_credentials
+from quantum_trade_utilities.core.get_path import get_path
+
+from hendricks._utils.rate_limiter import AdaptiveRateLimiter, get_rate_limiter
+
+# One client per thread; PRAW objects aren't safe to share between threads
+_clients = threading.local()
+
+# The script-app access token every client authorizes with, and its lock
+_shared_token = {}
+_token_lock = threading.RLock()
+# Authorizer attributes that make up a token (names differ across prawcore)
+_TOKEN_FIELDS = (
+    "access_token",
+    "scopes",
+    "_expiration_timestamp",
+    "_expiration_timestamp_ns",
+)
+
+
+class SharedTokenAuthorizer(prawcore.ScriptAuthorizer):
+    """
+    Script authorizer whose access token is shared by every client.
+
+    Clients stay per thread, but the first one to need a token fetches it
+    and the rest copy it, so a crawl signs in once however many workers or
+    request threads it uses. A token rejected by Reddit is dropped for all
+    clients, and the next refresh fetches one replacement.
+    """
+
+    def refresh(self):
+        with _token_lock:
+            if _shared_token:
+                self.__dict__.update(_shared_token)
+                if self.is_valid():
+                    return
+            super().refresh()
+            _shared_token.clear()
+            _shared_token.update(
+                {
+                    name: getattr(self, name)
+                    for name in _TOKEN_FIELDS
+                    if hasattr(self, name)
+                }
+            )
+
+    def _clear_access_token(self):
+        with _token_lock:
+            token = getattr(self, "access_token", None)
+            if token is not None and _shared_token.get("access_token") == token:
+                _shared_token.clear()
+            super()._clear_access_token()
+
+
+class RateLimitedRequestor(prawcore.Requestor):
+    """
+    Requestor that paces every Reddit request on one process-wide limiter.
+
+    Reddit's quota is per account, so all clients share the limiter, and
+    each response's ``X-Ratelimit-Remaining``/``X-Ratelimit-Reset`` headers
+    re-pace it for every thread at once.
+    """
+
+    def __init__(self, *args, rate_limiter=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter or get_rate_limiter(
+            "reddit", AdaptiveRateLimiter
+        )
+
+    def request(self, *args, **kwargs):
+        self.rate_limiter.acquire()
+        response = super().request(*args, **kwargs)
+        headers = response.headers
+        if "x-ratelimit-remaining" in headers:
+            self.rate_limiter.update(
+                float(headers["x-ratelimit-remaining"]),
+                float(headers.get("x-ratelimit-reset", 60)),
+            )
+        elif response.status_code == 429:
+            self.rate_limiter.update(0, float(headers.get("retry-after", 60)))
+        return response
+
+
+def create_reddit_client() -> praw.Reddit:
+    """Build a new PRAW client from the reddit_api credentials."""
+    CLIENT_ID, CLIENT_SECRET, USER_AGENT, USERNAME, PASSWORD = load_credentials(
+        get_path("creds"), "reddit_api"
+    )
+    reddit = praw.Reddit(
+        client_id=CLIENT_ID,
+        client_secret=CLIENT_SECRET,
+        user_agent=USER_AGENT,
+        username=USERNAME,
+        password=PASSWORD,
+        ratelimit_seconds=1,  # Wait 1 second between requests
+        timeout=30,  # 30 second timeout for requests
+        check_for_async=False,  # Disable async check warning
+        # Paced by the shared limiter instead of a fixed delay
+        requestor_class=RateLimitedRequestor,
+    )
+
+    reddit.config.timeout = 30  # 30 second timeout
+    reddit.config.retries = 3  # Retry failed requests up to 3 times
+
+    # PRAW builds its own ScriptAuthorizer; swap in one sharing the token
+    core = reddit._authorized_core
+    if isinstance(core.authorizer, prawcore.ScriptAuthorizer):
+        core._authorizer = SharedTokenAuthorizer(
+            authenticator=core.authorizer.authenticator,
+            username=USERNAME,
+            password=PASSWORD,
+        )
+    return reddit
+
+
+def get_reddit_client() -> praw.Reddit:
+    """
+    Return this thread's PRAW client, creating it on first use.
+
+    Every client authorizes with one process-wide OAuth token (see
+    ``SharedTokenAuthorizer``), reused and refreshed across every post,
+    comment and search request on every thread.
+    """
+    reddit = getattr(_clients, "reddit", None)
+    if reddit is None:
+        reddit = create_reddit_client()
+        _clients.reddit = reddit
+    return reddit
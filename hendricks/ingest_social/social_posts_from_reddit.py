@@ -3,28 +3,50 @@ Reddit-specific handlers for social media data ingestion.
 """
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from datetime import datetime
 import hashlib
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
-import praw
 from pymongo import UpdateOne
 from pymongo.errors import BulkWriteError
 
 load_dotenv()
 from quantum_trade_utilities.data.mongo_conn import mongo_conn
-from quantum_trade_utilities.data.load_credentials import load_credentials
-from quantum_trade_utilities.core.get_path import get_path
 from quantum_trade_utilities.data.mongo_coll_verification import (
     confirm_mongo_collect_exists,
 )
 
+from hendricks._utils.bulk_writer import BufferedBulkWriter
+from hendricks.ingest_social.comment_storage import CommentStorage, ThreadStore
+from hendricks.ingest_social.crawl_plan import (
+    NEW,
+    SCAN,
+    CrawlTask,
+    SubredditDirectory,
+    build_crawl_plan,
+)
+from hendricks.ingest_social.crawl_watermarks import (
+    CrawlWatermarks,
+    WatermarkedListing,
+)
+from hendricks.ingest_social.mention_extractor import MentionExtractor
+from hendricks.ingest_social.reddit_client import get_reddit_client
+
 # Set up logging
 logging.basicConfig(level=logging.WARNING)  # Set to WARNING to suppress DEBUG messages
 logger = logging.getLogger("pymongo")
 logger.setLevel(logging.WARNING)  # Suppress pymongo debug messages
 
+# Submissions looked up in Mongo per query
+LOOKUP_BATCH_SIZE = 100
+# Cap on comments requested when refreshing a grown thread
+NEW_COMMENTS_MAX = 500
+# Operations per bulk_write to the posts and comments collections
+WRITE_BATCH_SIZE = 1000
+
 
 def socialPosts_from_reddit(
     tickers=None,
@@ -36,33 +58,40 @@ def socialPosts_from_reddit(
     comment_depth=100,
     keywords=None,  # New parameter for additional keywords
     target_endpoint=None,
+    use_watermarks=True,
+    crawl_mode="search",
+    write_batch_size=WRITE_BATCH_SIZE,
+    max_workers=1,
+    comment_storage=None,
 ):
-    """Load Reddit data using PRAW."""
+    """
+    Load Reddit data using PRAW.
+
+    ``crawl_mode="search"`` runs Reddit searches per ticker; ``"scan"``
+    walks each subreddit once and tags every ticker a post mentions, using
+    a local Aho-Corasick matcher over tickers, $TICKER forms and keywords.
+
+    With ``use_watermarks`` each (subreddit, ticker, query) listing stops at
+    the newest post ingested by an earlier run, minus a small overlap.
+
+    Posts and comments are buffered and written ``write_batch_size``
+    operations at a time; comments are always flushed before the posts
+    that reference them, and watermarks only advance after both.
+
+    The crawl is planned up front as (ticker, subreddit, mode) tasks, with
+    ticker subreddits looked up once and cached, and up to ``max_workers``
+    tasks run at once, each worker on its own client. Every client paces its requests
+    on one limiter driven by Reddit's rate-limit headers.
+
+    ``comment_storage="threads"`` stores comments as bucketed thread
+    documents in ``<collection_name>Threads`` instead of one document per
+    comment and ticker.
+    """
     verbose = True
     # Set up logging
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
 
-    # Initialize PRAW with credentials
-    CLIENT_ID, CLIENT_SECRET, USER_AGENT, USERNAME, PASSWORD = load_credentials(
-        get_path("creds"), "reddit_api"
-    )
-    reddit = praw.Reddit(
-        client_id=CLIENT_ID,
-        client_secret=CLIENT_SECRET,
-        user_agent=USER_AGENT,
-        username=USERNAME,
-        password=PASSWORD,
-        ratelimit_seconds=1,  # Wait 1 second between requests
-        timeout=30,  # 30 second timeout for requests
-        check_for_async=False,  # Disable async check warning
-    )
-
-    # Configure rate limits based on Pro account
-    reddit.config.api_request_delay = 1.0  # 1 second between requests
-    reddit.config.timeout = 30  # 30 second timeout
-    reddit.config.retries = 3  # Retry failed requests up to 3 times
-
     # Get MongoDB connection and setup collections
     db = mongo_conn(mongo_db=mongo_db)
     posts_collection = f"{collection_name}Posts"
@@ -93,6 +122,9 @@ def socialPosts_from_reddit(
         background=True,  # Allow other operations while building index
     )
 
+    # For the per-page lookup of previously stored posts
+    posts_collection.create_index([("submission_id", 1), ("ticker", 1)])
+
     # Create indexes for common query patterns
     comments_collection.create_index([("timestamp", 1)])  # For date range queries
     comments_collection.create_index([("ticker", 1)])  # For ticker queries
@@ -112,253 +144,376 @@ def socialPosts_from_reddit(
         background=True,  # Allow other operations while building index
     )
 
-    # Create index on
+    # Newest post ingested per listing on earlier runs
+    watermarks = CrawlWatermarks(db, collection_name) if use_watermarks else None
 
     time_filter = reddit_load  # Changed from 'hour' to 'day'
     if verbose:
         logger.info(f"Running in {reddit_load} mode with comment depth {comment_depth}")
 
-    bulk_operations = []  # Initialize bulk_operations list at the top level
+    # Listings finished but not yet flushed: (sub, ticker, query, newest)
+    pending_watermarks = []
+    # Listings the flush in progress covers, taken before its comments flush
+    flushing_watermarks = []
+
+    def flush_comments():
+        # A listing finishing on another thread from here on may still have
+        # comments buffered after this flush, so its watermark waits. Any
+        # left by a flush that failed are dropped, not committed later
+        with state_lock:
+            flushing_watermarks[:] = pending_watermarks
+            pending_watermarks.clear()
+        comments_writer.flush()
+
+    def commit_watermarks():
+        while flushing_watermarks:
+            watermarks.advance(*flushing_watermarks.pop(0))
+
+    # Compact per-post thread documents instead of per-comment documents
+    thread_store = None
+    if CommentStorage.get_by_name(comment_storage) is CommentStorage.THREADS:
+        thread_store = ThreadStore(
+            db, collection_name, batch_size=write_batch_size, verbose=verbose
+        )
+        comments_writer = thread_store.writer
+    else:
+        comments_writer = BufferedBulkWriter(
+            comments_collection, batch_size=write_batch_size, verbose=verbose
+        )
+    posts_writer = BufferedBulkWriter(
+        posts_collection,
+        batch_size=write_batch_size,
+        before_flush=flush_comments if watermarks else comments_writer.flush,
+        on_flush=commit_watermarks if watermarks else None,
+        verbose=verbose,
+    )
     submission_count = 0
     comment_count = 0
 
-    for ticker in tickers:
-        if verbose:
-            logger.info(f"Processing ticker: {ticker}")
-
-        # Check if a subreddit exists for this ticker
-        try:
-            ticker_subreddit = reddit.subreddit(ticker)
-            # Test if subreddit exists by accessing a property
-            _ = ticker_subreddit.display_name
-            if verbose:
-                logger.info(f"Found dedicated subreddit for {ticker}")
+    # (submission id, ticker) pairs already written this run
+    seen_posts = set()
+    # Expanded comment rows by submission id, so each tree is fetched once
+    comment_cache = {}
+    # Posts whose comment count hasn't grown since they were stored
+    skipped_threads = 0
+    # Guards the run-wide state above when workers crawl concurrently
+    state_lock = threading.Lock()
+
+    def process_listing(submissions, sub, query, mark_ticker, tickers_for):
+        """Store a listing's posts and comments under the tickers each maps to."""
+        nonlocal submission_count, comment_count, skipped_threads
+
+        # Newest first, so stop once we reach ingested territory
+        submissions = WatermarkedListing(
+            submissions,
+            watermarks.cutoff(sub, mark_ticker, query) if watermarks else None,
+        )
 
-            # Add ticker subreddit to the list for processing
-            if subreddits is None:
-                subreddits = [ticker]
-            else:
-                subreddits.append(ticker)
+        # Track submissions being processed, a page at a time
+        for chunk in chunked(submissions, LOOKUP_BATCH_SIZE):
+            # Each (submission, ticker) is written and expanded once per run
+            with state_lock:
+                pairs = [
+                    (submission, ticker)
+                    for submission in chunk
+                    for ticker in tickers_for(submission)
+                    if (submission.id, ticker) not in seen_posts
+                ]
+                seen_posts.update(
+                    (submission.id, ticker) for submission, ticker in pairs
+                )
 
-        except Exception as e:
-            if verbose:
-                logger.info(f"No dedicated subreddit found for {ticker}: {str(e)}")
+            # One lookup for what we stored on earlier runs
+            stored = stored_post_state(
+                posts_collection,
+                [(submission.id, ticker) for submission, ticker in pairs],
+            )
 
-        # Process all subreddits (including ticker subreddit if found)
-        for sub in subreddits:
-            if verbose:
-                logger.info(f"Processing subreddit: {sub}")
+            # A submission shared by several tickers (scan mode) has one
+            # comment tree, so it is fetched in full if any ticker is new to
+            # it, or else deep enough for the ticker that is furthest behind
+            thread_known = {}
+            for submission, ticker in pairs:
+                known = stored.get((submission.id, ticker), {}).get("num_comments")
+                if submission.id not in thread_known:
+                    thread_known[submission.id] = known
+                elif known is None or thread_known[submission.id] is None:
+                    thread_known[submission.id] = None
+                else:
+                    thread_known[submission.id] = min(
+                        known, thread_known[submission.id]
+                    )
 
-            try:
-                subreddit = reddit.subreddit(sub)
-
-                # If this is the ticker's dedicated subreddit, get all posts
-                if sub.upper() == ticker.upper():
-                    if verbose:
-                        logger.info(f"Getting all posts from {ticker}'s subreddit")
-
-                    submissions = subreddit.new(limit=None)
-                    # Process all submissions from ticker subreddit
-                    bulk_operations = []  # Move this outside the submission loop
-                    for submission in submissions:
-                        submission_count += 1
-                        if verbose and submission_count % 100 == 0:
-                            logger.info(
-                                f"Processed {submission_count} submissions for {ticker}"
-                            )
-
-                        # Create unique_id and process submission
-                        unique_id_fields = f"{submission.title}{submission.author}{submission.subreddit}"
-                        unique_id = hashlib.sha256(
-                            unique_id_fields.encode()
-                        ).hexdigest()
-
-                        document = {
-                            "unique_id": unique_id,
-                            "ticker": ticker,
-                            "submission_id": submission.id,
-                            "timestamp": datetime.fromtimestamp(
-                                submission.created_utc, tz=ZoneInfo("UTC")
-                            ),
-                            "title": submission.title,
-                            "selftext": submission.selftext,
-                            "score": submission.score,
-                            "num_comments": submission.num_comments,
-                            "author": str(submission.author),
-                            "subreddit": str(submission.subreddit),
-                            "url": submission.url,
-                            "created_at": datetime.now(ZoneInfo("UTC")),
-                        }
-
-                        bulk_operations.append(
-                            UpdateOne(
-                                {"unique_id": unique_id},
-                                {"$set": document},
-                                upsert=True,
-                            )
+            for submission, ticker in pairs:
+                with state_lock:
+                    submission_count += 1
+                    if verbose and submission_count % 100 == 0:
+                        logger.info(
+                            f"Processed {submission_count} submissions for {ticker}"
                         )
 
-                        if len(bulk_operations) >= 5:
-                            execute_bulk_operations(
-                                posts_collection, bulk_operations, verbose
-                            )
-                            bulk_operations = []
-
-                        # Process comments
-                        comment_result = load_reddit_comments(
-                            post=submission,
-                            post_UID=unique_id,
-                            collection=comments_collection,
-                            ticker=ticker,
-                            comment_depth=comment_depth,
-                            mongo_db=mongo_db,
-                            verbose=verbose,
-                        )
-                        comment_count += comment_result
+                previous = stored.get((submission.id, ticker))
+                unique_id, operation = post_update_operation(submission, ticker)
+                post_changed = previous is None or previous.get(
+                    "feature_hash"
+                ) != post_feature_hash(submission)
 
-                        if verbose and comment_count % 1000 == 0:
-                            logger.info(
-                                f"Processed {comment_count} comments for {ticker}"
-                            )
-                # For other subreddits, use search as before
-                else:
-                    search_terms = get_ticker_keywords(
-                        ticker, keywords.get(ticker) if keywords else None
+                # Expand comments only for new posts or grown threads
+                known_comments = (
+                    None if previous is None else previous.get("num_comments")
+                )
+                if (
+                    known_comments is not None
+                    and submission.num_comments <= known_comments
+                ):
+                    with state_lock:
+                        skipped_threads += 1
+                    if post_changed:
+                        posts_writer.add(operation)
+                    continue
+
+                # Track comments
+                comment_result = load_reddit_comments(
+                    post=submission,
+                    post_UID=unique_id,
+                    collection=comments_collection,
+                    ticker=ticker,
+                    comment_depth=comment_depth,
+                    mongo_db=mongo_db,
+                    verbose=verbose,
+                    comment_cache=comment_cache,
+                    known_comments=thread_known[submission.id],
+                    writer=comments_writer,
+                    thread_store=thread_store,
+                )
+                # Only now record the new num_comments: if the comment fetch
+                # raised, the stored count stays behind and a later run retries
+                if post_changed:
+                    posts_writer.add(operation)
+                with state_lock:
+                    comment_count += comment_result
+                    if verbose and comment_count % 1000 == 0:
+                        logger.info(f"Processed {comment_count} comments for {ticker}")
+
+        # Only a fully processed listing moves the watermark, once it is stored
+        if watermarks:
+            with state_lock:
+                pending_watermarks.append((sub, mark_ticker, query, submissions.newest))
+            if verbose and submissions.reached_cutoff:
+                logger.info(f"Reached watermark for {mark_ticker} in {sub} ({query})")
+
+    extractor = MentionExtractor(tickers, keywords) if crawl_mode == SCAN else None
+
+    def run_task(task: CrawlTask):
+        """Read every listing of one planned (ticker, subreddit, mode) task."""
+        # Each worker thread crawls on its own client
+        subreddit = get_reddit_client().subreddit(task.subreddit)
+        if verbose:
+            logger.info(f"Processing {task.mode} of {task.subreddit} for {task.ticker}")
+
+        if task.mode == SCAN:
+            # One pass over the subreddit, tagging every ticker a post mentions
+            listings = [("scan", "*", subreddit.new(limit=None))]
+
+            def tickers_for(submission):
+                return extractor.extract(f"{submission.title}\n{submission.selftext}")
+
+        else:
+            if task.mode == NEW:
+                # The ticker's dedicated subreddit: get all posts
+                listings = [("new", task.ticker, subreddit.new(limit=None))]
+            else:
+                search_terms = get_ticker_keywords(
+                    task.ticker, keywords.get(task.ticker) if keywords else None
+                )
+                if verbose:
+                    logger.info(f"Using search terms: {search_terms}")
+
+                # Combined OR queries cover every term in all fields and flair
+                listings = (
+                    (
+                        query,
+                        task.ticker,
+                        subreddit.search(
+                            query,
+                            time_filter=time_filter,
+                            sort="new",
+                            limit=None,
+                            syntax="lucene",
+                        ),
                     )
-                    if verbose:
-                        logger.info(f"Using search terms: {search_terms}")
-
-                    for term in search_terms:
-                        search_queries = [
-                            f'"{term}"',  # Search all fields
-                            f'title:"{term}"',  # Specific title search
-                            f'selftext:"{term}"',  # Specific selftext search
-                            f'flair:"{term}"',  # Search flairs
-                        ]
-
-                        for query in search_queries:
-                            try:
-                                if verbose:
-                                    logger.info(f"Executing search query: {query}")
-
-                                submissions = subreddit.search(
-                                    query,
-                                    time_filter=time_filter,
-                                    sort="new",
-                                    limit=None,
-                                    syntax="lucene",
-                                )
-
-                                # Track submissions being processed
-                                for submission in submissions:
-                                    submission_count += 1
-                                    if verbose and submission_count % 100 == 0:
-                                        logger.info(
-                                            f"Processed {submission_count} submissions for {ticker}"
-                                        )
-
-                                    # Create unique_id and feature hash
-                                    unique_id_fields = f"{submission.title}{submission.author}{submission.subreddit}"
-                                    unique_id = hashlib.sha256(
-                                        unique_id_fields.encode()
-                                    ).hexdigest()
-
-                                    feature_values = {
-                                        "score": submission.score,
-                                        "num_comments": submission.num_comments,
-                                    }
-                                    feature_hash = hashlib.sha256(
-                                        str(feature_values).encode()
-                                    ).hexdigest()
-
-                                    document = {
-                                        "unique_id": unique_id,
-                                        "ticker": ticker,
-                                        "submission_id": submission.id,
-                                        "timestamp": datetime.fromtimestamp(
-                                            submission.created_utc, tz=ZoneInfo("UTC")
-                                        ),
-                                        "title": submission.title,
-                                        "selftext": submission.selftext,
-                                        **feature_values,
-                                        "feature_hash": feature_hash,
-                                        "author": str(submission.author),
-                                        "subreddit": str(submission.subreddit),
-                                        "url": submission.url,
-                                        "created_at": datetime.now(ZoneInfo("UTC")),
-                                    }
-
-                                    bulk_operations.append(
-                                        UpdateOne(
-                                            {
-                                                "unique_id": document["unique_id"],
-                                                "ticker": document["ticker"],
-                                                # Only update if hash is different or document doesn't exist
-                                                "$or": [
-                                                    {
-                                                        "feature_hash": {
-                                                            "$ne": feature_hash
-                                                        }
-                                                    },
-                                                    {
-                                                        "feature_hash": {
-                                                            "$exists": False
-                                                        }
-                                                    },
-                                                ],
-                                            },
-                                            {"$set": document},
-                                            upsert=True,
-                                        )
-                                    )
-
-                                    if len(bulk_operations) >= 5:
-                                        execute_bulk_operations(
-                                            posts_collection, bulk_operations, verbose
-                                        )
-                                        bulk_operations = []
-
-                                    # Track comments
-                                    comment_result = load_reddit_comments(
-                                        post=submission,
-                                        post_UID=unique_id,
-                                        collection=comments_collection,
-                                        ticker=ticker,
-                                        comment_depth=comment_depth,
-                                        mongo_db=mongo_db,
-                                        verbose=verbose,
-                                    )
-                                    comment_count += comment_result
-
-                                    if verbose and comment_count % 1000 == 0:
-                                        logger.info(
-                                            f"Processed {comment_count} comments for {ticker}"
-                                        )
-
-                                # Execute any remaining bulk operations
-                                if bulk_operations:
-                                    execute_bulk_operations(
-                                        posts_collection, bulk_operations, verbose
-                                    )
-                                    bulk_operations = []
-
-                            except Exception as e:
-                                logger.error(
-                                    f"Error with query '{query}' in {sub}: {str(e)}"
-                                )
-                                continue
+                    for query in build_search_queries(search_terms)
+                )
+
+            def tickers_for(submission):
+                return [task.ticker]
 
+        for query, mark_ticker, submissions in listings:
+            try:
+                process_listing(
+                    submissions, task.subreddit, query, mark_ticker, tickers_for
+                )
             except Exception as e:
-                logger.error(f"Error processing {ticker} in {sub}: {str(e)}")
+                logger.error(f"Error with listing in {task.subreddit}: {str(e)}")
                 continue
 
+    # Every listing up front; ticker subreddits are looked up once and cached
+    plan = build_crawl_plan(
+        tickers,
+        subreddits,
+        crawl_mode=crawl_mode,
+        directory=SubredditDirectory(db, collection_name),
+        max_workers=max_workers,
+    )
+    if verbose:
+        logger.info(f"Planned {len(plan)} crawl tasks")
+
+    def run_task_safely(task: CrawlTask):
+        try:
+            run_task(task)
+        except Exception as e:
+            logger.error(
+                f"Error processing {task.ticker} in {task.subreddit}: {str(e)}"
+            )
+
+    # Flushes comments then posts, then commits watermarks, even on error
+    with posts_writer:
+        if max_workers <= 1 or len(plan) <= 1:
+            for task in plan:
+                run_task_safely(task)
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(plan)),
+                thread_name_prefix="reddit-crawl",
+            ) as executor:
+                list(executor.map(run_task_safely, plan))
+
     if verbose:
         logger.info(
-            f"Final counts - Submissions: {submission_count}, Comments: {comment_count}"
+            f"Final counts - Submissions: {submission_count}, Comments: {comment_count}, "
+            f"Unchanged threads skipped: {skipped_threads}, "
+            f"Bulk writes: {posts_writer.round_trips + comments_writer.round_trips}"
         )
     return
 
 
+def build_search_queries(search_terms: list, max_length: int = 512) -> list:
+    """
+    Combine search terms into as few Lucene OR queries as fit Reddit's
+    query length limit.
+
+    A bare quoted term already matches title and selftext, so each term
+    contributes ``"term" OR flair:"term"``.
+    """
+    clauses = []
+    for term in dict.fromkeys(search_terms):
+        clauses.extend([f'"{term}"', f'flair:"{term}"'])
+
+    queries = []
+    current = ""
+    for clause in clauses:
+        candidate = f"{current} OR {clause}" if current else clause
+        if current and len(candidate) > max_length:
+            queries.append(current)
+            current = clause
+        else:
+            current = candidate
+    if current:
+        queries.append(current)
+    return queries
+
+
+def chunked(iterable, size: int):
+    """Yield lists of up to ``size`` items from an iterable."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stored_post_state(collection, pairs: list) -> dict:
+    """
+    num_comments and feature_hash of already-stored posts, keyed by
+    (submission id, ticker).
+    """
+    if not pairs:
+        return {}
+    wanted = set(pairs)
+    return {
+        (doc["submission_id"], doc["ticker"]): doc
+        for doc in collection.find(
+            {
+                "submission_id": {"$in": list({pair[0] for pair in wanted})},
+                "ticker": {"$in": list({pair[1] for pair in wanted})},
+            },
+            {
+                "submission_id": 1,
+                "ticker": 1,
+                "num_comments": 1,
+                "feature_hash": 1,
+                "_id": 0,
+            },
+        )
+        if (doc["submission_id"], doc["ticker"]) in wanted
+    }
+
+
+def post_feature_hash(submission) -> str:
+    """Hash of the post fields that change after it is first stored."""
+    feature_values = {
+        "score": submission.score,
+        "num_comments": submission.num_comments,
+    }
+    return hashlib.sha256(str(feature_values).encode()).hexdigest()
+
+
+def post_update_operation(submission, ticker):
+    """Build the (unique_id, upsert) for a submission stored under a ticker."""
+    # Create unique_id and feature hash
+    unique_id_fields = f"{submission.title}{submission.author}{submission.subreddit}"
+    unique_id = hashlib.sha256(unique_id_fields.encode()).hexdigest()
+
+    feature_values = {
+        "score": submission.score,
+        "num_comments": submission.num_comments,
+    }
+    feature_hash = post_feature_hash(submission)
+
+    document = {
+        "unique_id": unique_id,
+        "ticker": ticker,
+        "submission_id": submission.id,
+        "timestamp": datetime.fromtimestamp(submission.created_utc, tz=ZoneInfo("UTC")),
+        "title": submission.title,
+        "selftext": submission.selftext,
+        **feature_values,
+        "feature_hash": feature_hash,
+        "author": str(submission.author),
+        "subreddit": str(submission.subreddit),
+        "url": submission.url,
+        "created_at": datetime.now(ZoneInfo("UTC")),
+    }
+
+    operation = UpdateOne(
+        {
+            "unique_id": document["unique_id"],
+            "ticker": document["ticker"],
+            # Only update if hash is different or document doesn't exist
+            "$or": [
+                {"feature_hash": {"$ne": feature_hash}},
+                {"feature_hash": {"$exists": False}},
+            ],
+        },
+        {"$set": document},
+        upsert=True,
+    )
+    return unique_id, operation
+
+
 def load_reddit_comments(
     post,
     post_UID,
@@ -367,87 +522,82 @@ def load_reddit_comments(
     comment_depth=25,
     mongo_db="socialDB",
     verbose=False,
+    comment_cache=None,
+    known_comments: int = None,
+    writer: BufferedBulkWriter = None,
+    thread_store: ThreadStore = None,
 ):
-    """Load Reddit comments for a given post."""
-    # Initialize PRAW with all credentials
-    CLIENT_ID, CLIENT_SECRET, USER_AGENT, USERNAME, PASSWORD = load_credentials(
-        get_path("creds"), "reddit_api"
-    )
-    reddit = praw.Reddit(
-        client_id=CLIENT_ID,
-        client_secret=CLIENT_SECRET,
-        user_agent=USER_AGENT,
-        username=USERNAME,
-        password=PASSWORD,
-        ratelimit_seconds=1,  # Wait 1 second between requests
-        timeout=30,  # 30 second timeout for requests
-        check_for_async=False,  # Disable async check warning
-    )
-
-    # Configure rate limits
-    reddit.config.api_request_delay = 1.0
-    reddit.config.timeout = 30
-    reddit.config.retries = 3
-
+    """
+    Load Reddit comments for a given post.
+
+    ``post`` is the submission the crawler already holds; its comment tree is
+    expanded in place on the shared client rather than re-fetched by id.
+    With a ``comment_cache`` dict, a tree already expanded this run (for
+    another ticker) is reused instead of calling ``replace_more`` again.
+
+    ``known_comments`` is the comment count stored on an earlier run. When
+    given, only the newest comments are requested (sorted by new, limited to
+    roughly the growth) instead of the whole tree, by setting
+    ``comment_sort``/``comment_limit`` on ``post`` before its comments are
+    first read. Callers pass the same value for every ticker sharing a
+    submission object, so its one tree suits them all. Partial trees are
+    never cached.
+
+    With a ``writer`` the upserts are buffered on it instead of being
+    written with one bulk_write per post. With a ``thread_store`` the
+    comments are merged into the post's thread documents instead.
+    """
     processed_count = 0
     bulk_ops = []
 
     if verbose:
         logger.info(f"Processing comments for submission {post.id}")
 
-    # Fetch fresh submission and comments
-    submission = reddit.submission(id=post.id)
-    submission.comments.replace_more(limit=comment_depth)
-
-    all_comments = submission.comments.list()
+    all_comments = None if comment_cache is None else comment_cache.get(post.id)
+    if all_comments is None:
+        if known_comments is not None:
+            # Newest first, enough to cover what was added since the last crawl
+            growth = max(post.num_comments - known_comments, 0)
+            post.comment_sort = "new"
+            post.comment_limit = min(NEW_COMMENTS_MAX, 2 * growth + 10)
+
+        # Expand the comment tree
+        post.comments.replace_more(limit=comment_depth)
+        all_comments = [
+            {
+                "comment_id": comment.id,
+                "parent_id": comment.parent_id,
+                "depth": comment.depth,
+                "author": str(comment.author),
+                "body": comment.body,
+                "created_utc": comment.created_utc,
+                "score": comment.score,
+            }
+            for comment in post.comments.list()
+        ]
+        # Only complete trees can be reused for other tickers
+        if comment_cache is not None and known_comments is None:
+            comment_cache[post.id] = all_comments
     if verbose:
         logger.info(f"Found {len(all_comments)} total comments")
 
+    if thread_store is not None:
+        return thread_store.store(
+            post.id, post_UID, str(post.subreddit), ticker, all_comments
+        )
+
     for comment in all_comments:
         processed_count += 1
-        # Generate unique_id for comment
-        unique_id_fields = f"{comment.id}{comment.author}"
-        unique_id = hashlib.sha256(unique_id_fields.encode()).hexdigest()
-
-        feature_values = {
-            "score": comment.score,
-        }
-        feature_hash = hashlib.sha256(str(feature_values).encode()).hexdigest()
-
-        # Create comment document with feature hash and parent info
-        comment_doc = {
-            "unique_id": unique_id,
-            "post_id": post.id,
-            "post_UID": post_UID,
-            "comment_id": comment.id,
-            "parent_id": comment.parent_id,  # Will be 't3_postid' for top-level comments or 't1_commentid' for replies
-            "depth": comment.depth,  # Add comment depth in thread
-            "author": str(comment.author),
-            "body": comment.body,
-            "timestamp": datetime.fromtimestamp(comment.created_utc),
-            "ticker": ticker,
-            "subreddit": str(submission.subreddit),
-            "created_at": datetime.now(ZoneInfo("UTC")),
-            **feature_values,
-            "feature_hash": feature_hash,
-        }
-
         bulk_ops.append(
-            UpdateOne(
-                {
-                    "unique_id": comment_doc["unique_id"],
-                    "ticker": comment_doc["ticker"],
-                    # Only update if hash is different or document doesn't exist
-                    "$or": [
-                        {"feature_hash": {"$ne": feature_hash}},
-                        {"feature_hash": {"$exists": False}},
-                    ],
-                },
-                {"$set": comment_doc},
-                upsert=True,
+            comment_update_operation(
+                comment, post.id, post_UID, ticker, str(post.subreddit)
             )
         )
 
+    if writer is not None:
+        writer.extend(bulk_ops)
+        return processed_count
+
     # Execute bulk operations
     if bulk_ops:
         try:
@@ -473,6 +623,51 @@ def load_reddit_comments(
     return processed_count
 
 
+def comment_update_operation(comment: dict, post_id, post_UID, ticker, subreddit):
+    """Build the upsert for one comment row stored under a ticker."""
+    # Generate unique_id for comment
+    unique_id_fields = f"{comment['comment_id']}{comment['author']}"
+    unique_id = hashlib.sha256(unique_id_fields.encode()).hexdigest()
+
+    feature_values = {
+        "score": comment["score"],
+    }
+    feature_hash = hashlib.sha256(str(feature_values).encode()).hexdigest()
+
+    # Create comment document with feature hash and parent info
+    comment_doc = {
+        "unique_id": unique_id,
+        "post_id": post_id,
+        "post_UID": post_UID,
+        "comment_id": comment["comment_id"],
+        # Will be 't3_postid' for top-level comments or 't1_commentid' for replies
+        "parent_id": comment["parent_id"],
+        "depth": comment["depth"],  # Add comment depth in thread
+        "author": comment["author"],
+        "body": comment["body"],
+        "timestamp": datetime.fromtimestamp(comment["created_utc"]),
+        "ticker": ticker,
+        "subreddit": subreddit,
+        "created_at": datetime.now(ZoneInfo("UTC")),
+        **feature_values,
+        "feature_hash": feature_hash,
+    }
+
+    return UpdateOne(
+        {
+            "unique_id": comment_doc["unique_id"],
+            "ticker": comment_doc["ticker"],
+            # Only update if hash is different or document doesn't exist
+            "$or": [
+                {"feature_hash": {"$ne": feature_hash}},
+                {"feature_hash": {"$exists": False}},
+            ],
+        },
+        {"$set": comment_doc},
+        upsert=True,
+    )
+
+
 def execute_bulk_operations(collection, bulk_operations, verbose=False):
     """Execute bulk operations with error handling."""
     try:
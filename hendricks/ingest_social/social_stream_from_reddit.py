@@ -0,0 +1,183 @@
+"""
+Live Reddit ingestion: one long-lived stream of new submissions and comments.
+"""
+
+import logging
+import threading
+
+from dotenv import load_dotenv
+
+load_dotenv()
+from quantum_trade_utilities.data.mongo_conn import mongo_conn
+from quantum_trade_utilities.data.mongo_coll_verification import (
+    confirm_mongo_collect_exists,
+)
+
+from hendricks._utils.bulk_writer import BufferedBulkWriter
+from hendricks.ingest_social.mention_extractor import MentionExtractor
+from hendricks.ingest_social.reddit_client import create_reddit_client
+from hendricks.ingest_social.social_posts_from_reddit import (
+    comment_update_operation,
+    post_update_operation,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before reopening the streams after an error
+RECONNECT_DELAY = 30
+
+
+def socialStream_from_reddit(
+    tickers=None,
+    collection_name=None,
+    subreddits=None,
+    mongo_db="socialDB",
+    keywords=None,
+    batch_size: int = 100,
+    flush_interval: float = 5.0,
+    stop_event: threading.Event = None,
+    verbose=False,
+):
+    """
+    Stream new Reddit submissions and comments until ``stop_event`` is set.
+
+    Both streams run over one multireddit (``a+b+c``) and are polled in
+    turn, so a single client and connection cover every subreddit. Items
+    are matched to tickers locally and written through buffered writers in
+    micro-batches of up to ``batch_size`` operations, at least every
+    ``flush_interval`` seconds.
+    Streamed comments carry ``post_UID`` None, since resolving it would
+    cost a request per comment.
+    """
+    stop_event = stop_event or threading.Event()
+    subreddits = subreddits or ["wallstreetbets", "stocks", "investing"]
+    match_tickers = MentionExtractor(tickers, keywords).extract
+
+    # Get MongoDB connection and setup collections
+    db = mongo_conn(mongo_db=mongo_db)
+    posts_collection = f"{collection_name}Posts"
+    comments_collection = f"{collection_name}Comments"
+    confirm_mongo_collect_exists(posts_collection, mongo_db)
+    confirm_mongo_collect_exists(comments_collection, mongo_db)
+    posts_collection = db[posts_collection]
+    comments_collection = db[comments_collection]
+
+    comments_writer = BufferedBulkWriter(
+        comments_collection, batch_size, flush_interval, verbose=verbose
+    )
+    posts_writer = BufferedBulkWriter(
+        posts_collection,
+        batch_size,
+        flush_interval,
+        before_flush=comments_writer.flush,
+        verbose=verbose,
+    )
+    counts = {"submissions": 0, "comments": 0}
+
+    logger.info(f"Starting Reddit stream over {subreddits} for {tickers}")
+    while not stop_event.is_set():
+        try:
+            # Streams aren't thread-safe to share, so this thread owns its client
+            reddit = create_reddit_client()
+            multireddit = reddit.subreddit("+".join(subreddits))
+            # pause_after=-1 yields None whenever a poll has nothing new
+            submission_stream = multireddit.stream.submissions(
+                pause_after=-1, skip_existing=True
+            )
+            comment_stream = multireddit.stream.comments(
+                pause_after=-1, skip_existing=True
+            )
+
+            while not stop_event.is_set():
+                for submission in submission_stream:
+                    if submission is None or stop_event.is_set():
+                        break
+                    for ticker in match_tickers(
+                        f"{submission.title}\n{submission.selftext}"
+                    ):
+                        posts_writer.add(post_update_operation(submission, ticker)[1])
+                        counts["submissions"] += 1
+
+                for comment in comment_stream:
+                    if comment is None or stop_event.is_set():
+                        break
+                    tickers_found = match_tickers(comment.body)
+                    if not tickers_found:
+                        continue
+                    row = {
+                        "comment_id": comment.id,
+                        "parent_id": comment.parent_id,
+                        # Not part of the listing payload; reading it would refetch
+                        "depth": vars(comment).get("depth"),
+                        "author": str(comment.author),
+                        "body": comment.body,
+                        "created_utc": comment.created_utc,
+                        "score": comment.score,
+                    }
+                    post_id = comment.link_id.split("_", 1)[-1]
+                    for ticker in tickers_found:
+                        comments_writer.add(
+                            comment_update_operation(
+                                row, post_id, None, ticker, str(comment.subreddit)
+                            )
+                        )
+                        counts["comments"] += 1
+
+                # Quiet polls still flush whatever is buffered on time
+                flushes = posts_writer.round_trips
+                posts_writer.maybe_flush()
+                comments_writer.maybe_flush()
+                if verbose and posts_writer.round_trips != flushes:
+                    logger.info(f"Reddit stream totals: {counts}")
+
+        except Exception as e:
+            logger.error(f"Reddit stream error, reconnecting: {str(e)}")
+            try:
+                posts_writer.flush()
+            except Exception as e:
+                # Mongo may be what failed; keep streaming rather than die here
+                logger.error(f"Reddit stream flush failed: {str(e)}")
+            stop_event.wait(RECONNECT_DELAY)
+
+    posts_writer.close()
+    logger.info(f"Reddit stream stopped: {counts}")
+    return counts
+
+
+_streams = {}
+_streams_lock = threading.Lock()
+
+
+def start_social_stream(name: str, stream_function, **kwargs) -> bool:
+    """
+    Run ``stream_function`` (e.g. ``socialStream_from_reddit``) in a
+    background thread under ``name``.
+
+    Returns False if a stream with that name is already running.
+    """
+    with _streams_lock:
+        running = _streams.get(name)
+        if running is not None and running[0].is_alive():
+            return False
+
+        stop_event = threading.Event()
+        thread = threading.Thread(
+            target=stream_function,
+            kwargs={**kwargs, "stop_event": stop_event},
+            name=f"social-stream-{name}",
+            daemon=True,
+        )
+        _streams[name] = (thread, stop_event)
+        thread.start()
+        return True
+
+
+def stop_social_streams(timeout: float = 10.0):
+    """Signal every live social stream to flush and stop."""
+    with _streams_lock:
+        streams = list(_streams.values())
+        _streams.clear()
+    for _, stop_event in streams:
+        stop_event.set()
+    for thread, _ in streams:
+        thread.join(timeout=timeout)
@@ -0,0 +1,90 @@
+"""
+In-memory latest trade and latest minute bar per symbol, fed by the stream.
+"""
+
+import threading
+
+
+class SnapshotCache:
+    """
+    Latest trade, last completed one-minute bar and the bar in progress for
+    every streamed symbol. Reads are served from memory in O(symbols).
+    """
+
+    def __init__(self):
+        self._trades = {}
+        self._bars = {}
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def update_trade(self, item: dict):
+        """Fold an Alpaca trade message into the snapshot."""
+        symbol = item.get("S")
+        timestamp = item.get("t")
+        price = item.get("p")
+        size = item.get("s") or 0
+        if symbol is None or timestamp is None or price is None:
+            return
+
+        # RFC-3339 strings share a prefix down to the minute
+        minute = timestamp[:16]
+
+        with self._lock:
+            self._trades[symbol] = {
+                "timestamp": timestamp,
+                "price": price,
+                "size": size,
+                "exchange": item.get("x"),
+                "trade_id": item.get("i"),
+            }
+
+            bar = self._building.get(symbol)
+            if bar is None or minute > bar["minute"]:
+                if bar is not None:
+                    self._bars[symbol] = self._finish_bar(bar)
+                self._building[symbol] = {
+                    "minute": minute,
+                    "open": price,
+                    "high": price,
+                    "low": price,
+                    "close": price,
+                    "volume": size,
+                    "trades": 1,
+                }
+            elif minute == bar["minute"]:
+                bar["high"] = max(bar["high"], price)
+                bar["low"] = min(bar["low"], price)
+                bar["close"] = price
+                bar["volume"] += size
+                bar["trades"] += 1
+            # Trades for an already closed minute only update the last trade
+
+    @staticmethod
+    def _finish_bar(bar: dict) -> dict:
+        finished = dict(bar)
+        finished["timestamp"] = f"{finished.pop('minute')}:00Z"
+        return finished
+
+    def get(self, symbols: list = None) -> dict:
+        """Latest trade and bars for the requested symbols (all if None)."""
+        with self._lock:
+            if symbols is None:
+                symbols = list(self._trades)
+            snapshots = {}
+            for symbol in symbols:
+                trade = self._trades.get(symbol)
+                if trade is None:
+                    continue
+                building = self._building.get(symbol)
+                snapshots[symbol] = {
+                    "last_trade": dict(trade),
+                    "last_bar": dict(self._bars[symbol])
+                    if symbol in self._bars
+                    else None,
+                    "current_bar": self._finish_bar(building) if building else None,
+                }
+        return snapshots
+
+
+# Shared by every stream in this process and read by the Flask app
+snapshot_cache = SnapshotCache()
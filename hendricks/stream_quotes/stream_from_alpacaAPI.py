@@ -2,6 +2,7 @@
 Load stream quote data from Alpaca API into a MongoDB collection.
 """
 
+import time
 from datetime import datetime, timezone
 
 from quantum_trade_utilities.data.mongo_conn import mongo_conn
@@ -10,11 +11,26 @@ from quantum_trade_utilities.data.mongo_coll_verification import (
 )
 
 
+def build_trade_document(stream_data):
+    """Build the rawPriceColl document for an Alpaca trade message."""
+    return {
+        "ticker": stream_data.get("S"),  # Ticker symbol
+        "timestamp": stream_data.get("t"),  # Timestamp of the trade
+        "price": stream_data.get("p"),  # Price of the trade
+        "size": stream_data.get("s"),  # Size of the trade
+        "exchange": stream_data.get("x"),  # Exchange where the trade occurred
+        "trade_id": stream_data.get("i"),  # Unique trade identifier
+        "conditions": stream_data.get("c"),  # Conditions of the trade
+        "created_at": datetime.now(timezone.utc),  # Document creation time in UTC
+    }
+
+
 def stream_from_alpacaAPI(
     stream_data,
     collection_name,
     creds_file_path,
     mongo_db: str = "stocksDB",
+    metrics=None,
 ):
     """
     Load historical quote data from Alpaca API into a MongoDB collection.
@@ -32,16 +48,10 @@ def stream_from_alpacaAPI(
     collection.create_index([("timestamp", 1), ("ticker", 1)], unique=True)
 
     # Construct the document to be stored in MongoDB
-    document = {
-        "ticker": stream_data.get("S"),  # Ticker symbol
-        "timestamp": stream_data.get("t"),  # Timestamp of the trade
-        "price": stream_data.get("p"),  # Price of the trade
-        "size": stream_data.get("s"),  # Size of the trade
-        "exchange": stream_data.get("x"),  # Exchange where the trade occurred
-        "trade_id": stream_data.get("i"),  # Unique trade identifier
-        "conditions": stream_data.get("c"),  # Conditions of the trade
-        "created_at": datetime.now(timezone.utc),  # Document creation time in UTC
-    }
+    document = build_trade_document(stream_data)
 
     # Here you would insert the document into your MongoDB collection
+    insert_start = time.perf_counter()
     collection.insert_one(document)
+    if metrics is not None:
+        metrics.record_insert(time.perf_counter() - insert_start)
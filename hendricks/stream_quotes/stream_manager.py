@@ -0,0 +1,207 @@
+"""
+Manage long-running quote streams inside the Hendricks service.
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+
+from hendricks.ingest_quotes.load_quote_data import DataLoader
+from hendricks.stream_quotes.stream_ticker_data import DataStreamer
+
+logger = logging.getLogger(__name__)
+
+
+class ManagedStream:
+    """
+    One DataStreamer running on its own event loop thread.
+    """
+
+    def __init__(self, name, streamer, data_loader):
+        self.name = name
+        self.streamer = streamer
+        self.data_loader = data_loader
+        self.started_at = datetime.now(timezone.utc)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self._run_loop, name=f"stream-{name}", daemon=True
+        )
+        self.future = None
+        self.task = None
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            # Drain anything a timed-out stop left behind before closing
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(
+                    asyncio.gather(*pending, return_exceptions=True)
+                )
+            self.loop.close()
+            # Closed on the loop's own thread, once nothing can write to the WAL
+            self.streamer.close()
+
+    async def _stream(self):
+        self.task = asyncio.current_task()
+        await self.streamer.data_stream(self.data_loader)
+
+    async def _cancel_and_wait(self):
+        """Cancel the stream task and wait for its cleanup to run."""
+        if self.task is None or self.task.done():
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Stream {self.name} failed while stopping: {e}")
+
+    def start(self):
+        """Start the loop thread and schedule the stream on it."""
+        self.thread.start()
+        self.future = asyncio.run_coroutine_threadsafe(self._stream(), self.loop)
+
+    def call(self, coro, timeout: float = 10.0):
+        """
+        Run a coroutine on the stream's loop and wait for its result.
+
+        Raises RuntimeError if the loop isn't running and TimeoutError if
+        the coroutine doesn't finish within ``timeout``.
+        """
+        if not self.thread.is_alive() or self.loop.is_closed():
+            coro.close()
+            raise RuntimeError(f"Stream {self.name} is not running")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Cancel the stream and wait for it to unwind, then stop its loop,
+        which flushes the WAL on the way out.
+        """
+        if not self.thread.is_alive():
+            if self.thread.ident is None:
+                # Never started, so nothing else owns the WAL
+                self.streamer.close()
+            return
+        try:
+            self.call(self._cancel_and_wait(), timeout)
+        except Exception as e:
+            logger.error(f"Stream {self.name} did not stop within {timeout}s: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        """Whether the stream task is still alive."""
+        return self.future is not None and not self.future.done()
+
+    def status(self) -> dict:
+        """Lifecycle state and headline metrics for the stream."""
+        error = None
+        if self.future is not None and self.future.done():
+            if not self.future.cancelled() and self.future.exception() is not None:
+                error = str(self.future.exception())
+        metrics = self.streamer.metrics
+        return {
+            "name": self.name,
+            "tickers": list(self.streamer.tickers),
+            "collection": self.streamer.collection_name,
+            "mongo_db": self.data_loader.mongo_db,
+            "state": self.streamer.state,
+            "running": self.running,
+            "error": error,
+            "started_at": self.started_at.isoformat(),
+            "messages": metrics.messages,
+            "messages_per_sec": round(metrics.messages_per_sec, 2),
+            "reconnects": metrics.reconnects,
+        }
+
+
+class StreamManager:
+    """
+    Registry of managed streams, keyed by stream name.
+    """
+
+    def __init__(self):
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> ManagedStream:
+        stream = self._streams.get(name)
+        if stream is None:
+            raise KeyError(f"No stream named {name}")
+        return stream
+
+    def start(
+        self,
+        name: str,
+        tickers: list,
+        collection_name: str = "rawPriceColl",
+        mongo_db: str = "stocksDB",
+    ) -> dict:
+        """Start a stream for a list of symbols."""
+        with self._lock:
+            existing = self._streams.get(name)
+            if existing is not None and existing.running:
+                raise ValueError(f"Stream {name} is already running")
+            if existing is not None:
+                existing.stop()
+
+            data_loader = DataLoader(
+                tickers=tickers, collection_name=collection_name, mongo_db=mongo_db
+            )
+            streamer = DataStreamer(
+                tickers=tickers, collection_name=collection_name, name=name
+            )
+            stream = ManagedStream(name, streamer, data_loader)
+            stream.start()
+            self._streams[name] = stream
+
+        logger.info(f"Started stream {name} for {tickers}")
+        return stream.status()
+
+    def add_symbols(self, name: str, symbols: list) -> dict:
+        """Subscribe a running stream to more symbols."""
+        stream = self._get(name)
+        stream.call(stream.streamer.subscribe(symbols))
+        return stream.status()
+
+    def remove_symbols(self, name: str, symbols: list) -> dict:
+        """Unsubscribe a running stream from some symbols."""
+        stream = self._get(name)
+        stream.call(stream.streamer.unsubscribe(symbols))
+        return stream.status()
+
+    def stop(self, name: str) -> dict:
+        """Stop a stream and forget it."""
+        with self._lock:
+            stream = self._get(name)
+            stream.stop()
+            del self._streams[name]
+        logger.info(f"Stopped stream {name}")
+        return stream.status()
+
+    def stop_all(self):
+        """Stop every managed stream."""
+        for name in list(self._streams):
+            try:
+                self.stop(name)
+            except Exception as e:
+                logger.error(f"Error stopping stream {name}: {e}")
+
+    def status(self, name: str = None) -> list:
+        """Status of one stream, or of all streams."""
+        if name is not None:
+            return [self._get(name).status()]
+        return [stream.status() for stream in list(self._streams.values())]
+
+
+# Streams managed by this process
+stream_manager = StreamManager()
@@ -0,0 +1,201 @@
+"""
+Latency and throughput instrumentation for the quote stream.
+"""
+
+import time
+import logging
+from bisect import bisect_left
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+# The loaders set the root logger to WARNING; the summary line is INFO
+logger.setLevel(logging.INFO)
+
+# Upper bucket bounds in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (
+    0.5,
+    1,
+    2,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+    30000,
+)
+
+# Every metrics object created in this process, keyed by stream name
+_STREAM_METRICS = {}
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram, cheap enough to update per message.
+    """
+
+    def __init__(self, bounds_ms=LATENCY_BUCKETS_MS):
+        self.bounds_ms = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float):
+        """Add one observation."""
+        self.counts[bisect_left(self.bounds_ms, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile."""
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        for idx, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target and idx < len(self.bounds_ms):
+                return min(self.bounds_ms[idx], round(self.max_ms, 3))
+            if running >= target:
+                break
+        return round(self.max_ms, 3)
+
+    def snapshot(self) -> dict:
+        """Summary statistics plus raw bucket counts."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.percentile(0.50),
+            "p90_ms": self.percentile(0.90),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets_ms": list(self.bounds_ms),
+            "bucket_counts": list(self.counts),
+        }
+
+
+def parse_exchange_ts(ts: str) -> float:
+    """Convert an Alpaca RFC-3339 timestamp (up to ns precision) to epoch seconds."""
+    if not ts:
+        return None
+    ts = ts.rstrip("Z")
+    if "." in ts:
+        base, frac = ts.split(".", 1)
+        ts = f"{base}.{frac[:6]}"
+    return datetime.fromisoformat(ts + "+00:00").timestamp()
+
+
+class StreamMetrics:
+    """
+    Stage latencies, throughput, queue depth and reconnects for one stream.
+
+    Stages are exchange -> receive, receive -> parsed, parsed -> persisted,
+    the end-to-end exchange -> persisted, and the Mongo insert itself. The
+    receive time is taken as the socket delivers a message, so time spent
+    waiting to be processed counts toward receive -> parsed.
+    """
+
+    STAGES = ("exchange_to_receive", "receive_to_parsed", "parsed_to_persisted")
+
+    def __init__(self, name: str = "stream", log_interval: float = 60.0):
+        self.name = name
+        self.log_interval = log_interval
+        self.histograms = {
+            stage: LatencyHistogram()
+            for stage in (*self.STAGES, "end_to_end", "db_insert")
+        }
+        self.messages = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.reconnects = 0
+        self.started_at = time.time()
+        self._window_start = time.monotonic()
+        self._window_messages = 0
+        self.messages_per_sec = 0.0
+        _STREAM_METRICS[name] = self
+
+    def record_trade(self, exchange_ts, received: float, parsed: float, persisted):
+        """Record the stage latencies of one persisted trade (epoch seconds)."""
+        self.messages += 1
+        self._window_messages += 1
+        self.histograms["receive_to_parsed"].record((parsed - received) * 1000)
+        self.histograms["parsed_to_persisted"].record((persisted - parsed) * 1000)
+
+        try:
+            exchange_time = parse_exchange_ts(exchange_ts)
+        except ValueError:
+            exchange_time = None
+        if exchange_time is not None:
+            self.histograms["exchange_to_receive"].record(
+                max(received - exchange_time, 0) * 1000
+            )
+            self.histograms["end_to_end"].record(
+                max(persisted - exchange_time, 0) * 1000
+            )
+
+    def record_insert(self, elapsed: float):
+        """Record the duration of one Mongo insert in seconds."""
+        self.histograms["db_insert"].record(elapsed * 1000)
+
+    def set_queue_depth(self, depth: int):
+        """Record how many messages are waiting to be processed."""
+        self.queue_depth = depth
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def record_reconnect(self):
+        """Count a dropped connection that will be retried."""
+        self.reconnects += 1
+
+    def _roll_window(self):
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed > 0:
+            self.messages_per_sec = self._window_messages / elapsed
+        self._window_start = now
+        self._window_messages = 0
+
+    def maybe_log(self):
+        """Emit the compact summary line once per log interval."""
+        if time.monotonic() - self._window_start < self.log_interval:
+            return
+        self._roll_window()
+        e2e = self.histograms["end_to_end"]
+        persist = self.histograms["parsed_to_persisted"]
+        logger.info(
+            f"[stream {self.name}] msgs={self.messages} "
+            f"rate={self.messages_per_sec:.1f}/s "
+            f"e2e_p50={e2e.percentile(0.5)}ms e2e_p99={e2e.percentile(0.99)}ms "
+            f"persist_p99={persist.percentile(0.99)}ms "
+            f"queue={self.queue_depth} queue_max={self.max_queue_depth} "
+            f"reconnects={self.reconnects}"
+        )
+
+    def snapshot(self) -> dict:
+        """All metrics as a JSON-serializable dict."""
+        return {
+            "name": self.name,
+            "uptime_sec": round(time.time() - self.started_at, 1),
+            "messages": self.messages,
+            "messages_per_sec": round(self.messages_per_sec, 2),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "reconnects": self.reconnects,
+            "latency": {
+                stage: histogram.snapshot()
+                for stage, histogram in self.histograms.items()
+            },
+        }
+
+
+def stream_metrics_snapshot() -> dict:
+    """Snapshot of every stream's metrics in this process."""
+    return {name: metrics.snapshot() for name, metrics in _STREAM_METRICS.items()}
@@ -3,9 +3,18 @@ Load ticker data into MongoDB.
 """
 import os
 import json
+import time
 import asyncio
+from datetime import datetime, timezone
+from functools import partial
 import dotenv
 import websockets
+from pymongo.errors import DuplicateKeyError
+
+from hendricks.stream_quotes.snapshot_cache import snapshot_cache
+from hendricks.stream_quotes.stream_metrics import StreamMetrics, parse_exchange_ts
+from hendricks.stream_quotes.stream_wal import StreamWAL
+from hendricks.stream_quotes.trades_from_alpacaAPI import trades_from_alpacaAPI
 
 dotenv.load_dotenv()
 
@@ -20,18 +29,161 @@ class DataStreamer:
         file: str = None,
         tickers: list = None,
         collection_name: str = "rawPriceColl",
+        use_wal: bool = True,
+        wal_dir: str = None,
+        name: str = None,
     ):
         self.file = file
-        self.tickers = tickers
+        self.tickers = list(tickers or [])
         self.collection_name = collection_name
+        self.name = name or collection_name
         self.API_KEY = os.getenv("API_KEY")
         self.API_SECRET = os.getenv("API_SECRET")
+        # Trades are logged locally before they are written to Mongo
+        self.wal = StreamWAL(name=self.name, wal_dir=wal_dir) if use_wal else None
+        # Exchange timestamp of the last trade seen per symbol, for gap backfill
+        self.last_trade_ts = {}
+        self.disconnected_at = None
+        self.metrics = StreamMetrics(name=self.name)
+        # Live connection and lifecycle state, used to resize and report streams
+        self.websocket = None
+        self.state = "idle"
+
+    def persist_trade(self, data_loader, item):
+        """Log a trade to the WAL, write it to Mongo, then commit it."""
+        # Serve the latest price from memory, even if the write below fails
+        snapshot_cache.update_trade(item)
+        seq = self.wal.append(item) if self.wal is not None else None
+        try:
+            data_loader.load_stream_doc(item, metrics=self.metrics)
+        except DuplicateKeyError:
+            pass  # Already persisted
+        if seq is not None:
+            self.wal.commit(seq)
+        self.last_trade_ts[item.get("S")] = item.get("t")
+
+    def _gap_starts(self) -> dict:
+        """
+        Where to resume each symbol: its last trade if that predates the
+        disconnect, the disconnect itself if it has none. Symbols already
+        seen trading since the disconnect have no gap.
+        """
+        disconnected = self.disconnected_at.timestamp()
+        starts = {}
+        for symbol in self.tickers:
+            last_ts = self.last_trade_ts.get(symbol)
+            try:
+                last_time = parse_exchange_ts(last_ts)
+            except ValueError:
+                last_time = None
+            if last_time is None:
+                starts[symbol] = self.disconnected_at.isoformat()
+            elif last_time < disconnected:
+                starts[symbol] = last_ts
+        return starts
+
+    async def backfill_gaps(self, data_loader):
+        """Fetch trades missed while disconnected through the Alpaca REST path."""
+        if self.disconnected_at is None:
+            return 0
+
+        now = datetime.now(timezone.utc).isoformat()
+        starts = self._gap_starts()
+        loop = asyncio.get_running_loop()
+
+        # One REST fetch per affected symbol, run concurrently off the event loop
+        symbols = list(starts)
+        tasks = [
+            loop.run_in_executor(
+                None,
+                partial(
+                    trades_from_alpacaAPI,
+                    tickers=[symbol],
+                    collection_name=data_loader.collection_name,
+                    creds_file_path=data_loader.creds_file_path,
+                    from_date=starts[symbol],
+                    to_date=now,
+                    mongo_db=data_loader.mongo_db,
+                ),
+            )
+            for symbol in symbols
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        backfilled = 0
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                print(f"Gap backfill failed for {symbol}: {result}")
+            else:
+                backfilled += result
+        print(
+            f"Backfilled {backfilled} trades for {len(symbols)} of "
+            f"{len(self.tickers)} symbols missed during the disconnect"
+        )
+        self.disconnected_at = None
+        return backfilled
+
+    async def subscribe(self, symbols: list):
+        """Add symbols to the stream, subscribing live if connected."""
+        new_symbols = [symbol for symbol in symbols if symbol not in self.tickers]
+        if not new_symbols:
+            return self.tickers
+        self.tickers.extend(new_symbols)
+        if self.websocket is not None:
+            await self.websocket.send(
+                json.dumps({"action": "subscribe", "trades": new_symbols})
+            )
+        return self.tickers
+
+    async def unsubscribe(self, symbols: list):
+        """Remove symbols from the stream, unsubscribing live if connected."""
+        old_symbols = [symbol for symbol in symbols if symbol in self.tickers]
+        if not old_symbols:
+            return self.tickers
+        self.tickers = [symbol for symbol in self.tickers if symbol not in old_symbols]
+        for symbol in old_symbols:
+            self.last_trade_ts.pop(symbol, None)
+        if self.websocket is not None:
+            await self.websocket.send(
+                json.dumps({"action": "unsubscribe", "trades": old_symbols})
+            )
+        return self.tickers
+
+    def close(self):
+        """Flush the WAL once the stream has stopped."""
+        self.state = "stopped"
+        if self.wal is not None:
+            self.wal.close()
+
+    def replay_wal(self, data_loader):
+        """Write any trades the WAL holds that never reached Mongo."""
+        if self.wal is None or not self.wal.has_pending():
+            return 0
+
+        replayed = 0
+        last_seq = None
+        for seq, item in self.wal.pending():
+            try:
+                data_loader.load_stream_doc(item)
+            except DuplicateKeyError:
+                pass  # Persisted before the crash, commit never recorded
+            last_seq = seq
+            replayed += 1
+
+        if last_seq is not None:
+            self.wal.commit(last_seq)
+        print(f"Replayed {replayed} trades from the WAL into {self.collection_name}")
+        return replayed
 
     async def data_stream(self, data_loader):
         """Stream data from the Alpaca API."""
         uri = "wss://stream.data.alpaca.markets/v2/iex"
         while True:  # Loop to handle reconnection
             try:
+                self.state = "connecting"
+                # Recover anything left unpersisted by a crash or failed write
+                self.replay_wal(data_loader)
+
                 async with websockets.connect(uri) as websocket:
                     # Authenticate with Alpaca
                     await websocket.send(
@@ -51,21 +203,34 @@ class DataStreamer:
                     await websocket.send(
                         json.dumps({"action": "subscribe", "trades": self.tickers})
                     )
+                    # From here on subscribe/unsubscribe send their own frames,
+                    # so changes made during the backfill reach the stream
+                    self.websocket = websocket
                     response = await websocket.recv()
                     print("Subscription response:", response)
-                    print(websocket.messages)
-
-                    # Stream data
-                    while True:
-                        # Wait for messages to be available
-                        if (
-                            websocket.messages
-                        ):  # Check if there are messages in the deque
-                            message = (
-                                websocket.messages.popleft()
-                            )  # Dequeue the first message
+
+                    # Fill the window we missed before the subscription resumed
+                    await self.backfill_gaps(data_loader)
+                    self.state = "streaming"
+
+                    # Stream data, stamped on arrival by the receiver task
+                    inbox = asyncio.Queue()
+                    receiver = asyncio.create_task(self._receive(websocket, inbox))
+                    try:
+                        while True:
+                            try:
+                                received, message = await asyncio.wait_for(
+                                    inbox.get(), timeout=1.0
+                                )
+                            except asyncio.TimeoutError:
+                                self.metrics.maybe_log()
+                                continue
+                            if received is None:
+                                raise message  # The connection dropped
+                            self.metrics.set_queue_depth(inbox.qsize())
+
                             stream_data = json.loads(message)  # Parse the JSON message
-                            # print("Received data:", stream_data)
+                            parsed = time.time()
 
                             # Process the received data
                             for item in stream_data:
@@ -73,35 +238,49 @@ class DataStreamer:
                                 if (
                                     "T" in item and item["T"] == "t"
                                 ):  # 't' indicates a trade message
-                                    data_loader.load_stream_doc(item)
+                                    self.persist_trade(data_loader, item)
+                                    self.metrics.record_trade(
+                                        item.get("t"), received, parsed, time.time()
+                                    )
 
-                        await asyncio.sleep(0.1)  # Small delay to prevent busy waiting
+                            self.metrics.maybe_log()
+                    finally:
+                        receiver.cancel()
 
             except websockets.exceptions.ConnectionClosedError as e:
                 print(f"WebSocket connection closed with error: {e}")
+                self.mark_disconnected()
                 await asyncio.sleep(5)  # Wait before reconnecting
             except BrokenPipeError as e:
                 print(f"Broken pipe error: {e}")
+                self.mark_disconnected()
                 await asyncio.sleep(5)  # Wait before reconnecting
             except Exception as e:
                 print(f"An error occurred: {e}")
+                self.mark_disconnected()
                 await asyncio.sleep(5)  # Wait before reconnecting
             finally:
+                # Subscriptions end with the connection, nothing to unsubscribe
+                self.websocket = None
                 print("WebSocket connection closed.")
-                # Unsubscribe from the ticker
-                try:
-                    async with websockets.connect(uri) as websocket:
-                        print(f"Unsubscribing from {self.tickers}")
-                        await websocket.send(
-                            json.dumps(
-                                {"action": "unsubscribe", "trades": self.tickers}
-                            )
-                        )
-                        response = await websocket.recv()
-                        print("Unsubscription response:", response)
-                except Exception as e:
-                    print(f"An error occurred during unsubscription: {e}")
-                print("WebSocket connection closed.")
+
+    @staticmethod
+    async def _receive(websocket, inbox):
+        """Queue (received_at, message) as each message comes off the socket."""
+        try:
+            while True:
+                message = await websocket.recv()
+                inbox.put_nowait((time.time(), message))
+        except Exception as e:
+            # Hand the close to the processing loop so it reconnects
+            inbox.put_nowait((None, e))
+
+    def mark_disconnected(self):
+        """Remember when the current outage started."""
+        self.state = "reconnecting"
+        self.metrics.record_reconnect()
+        if self.disconnected_at is None:
+            self.disconnected_at = datetime.now(timezone.utc)
 
     def start_streaming(self, data_loader):
         """Start the streaming process."""
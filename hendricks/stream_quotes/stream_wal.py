@@ -0,0 +1,255 @@
+"""
+Segmented write-ahead log for streamed trade messages.
+"""
+
+import os
+import json
+import fcntl
+import time
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Every WAL opened in this process, so shutdown hooks can flush them
+_OPEN_WALS = weakref.WeakSet()
+
+
+def default_wal_dir():
+    """Directory used for WAL segments when none is given."""
+    return os.getenv(
+        "HENDRICKS_WAL_DIR",
+        os.path.join(os.path.expanduser("~"), ".hendricks", "wal"),
+    )
+
+
+class StreamWAL:
+    """
+    Append-only log of raw stream messages, split into numbered segments.
+
+    Each message gets a sequence number and is written (and flushed to the OS)
+    before it is handed to the Mongo writer, so a killed process loses nothing.
+    fsync is batched by ``fsync_interval`` to keep the hot path cheap; use
+    ``fsync_policy="always"`` to sync every record or ``"never"`` to rely on
+    the OS. Once a sequence number is committed, every segment that only holds
+    older records is deleted.
+
+    A WAL is owned by one process at a time: ``<name>.lock`` is locked on
+    open and released on close, and a second open under the same name (e.g.
+    the CLI and the service streaming into one collection) fails fast
+    instead of truncating or replaying the other process's log.
+    """
+
+    def __init__(
+        self,
+        name: str = "stream",
+        wal_dir: str = None,
+        segment_max_bytes: int = 8 * 1024 * 1024,
+        fsync_policy: str = "interval",
+        fsync_interval: float = 0.05,
+        checkpoint_interval: float = 1.0,
+    ):
+        if fsync_policy not in ("always", "interval", "never"):
+            raise ValueError(f"Unsupported fsync policy: {fsync_policy}")
+
+        self.name = name
+        self.wal_dir = wal_dir or default_wal_dir()
+        self.segment_max_bytes = int(segment_max_bytes)
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.checkpoint_interval = checkpoint_interval
+
+        os.makedirs(self.wal_dir, exist_ok=True)
+        self._lock_fh = self._acquire_lock()
+        self._checkpoint_path = os.path.join(self.wal_dir, f"{self.name}.ckpt")
+
+        self._committed = self._read_checkpoint()
+        self._checkpointed = self._committed
+        self._last_checkpoint = time.monotonic()
+        self._last_fsync = time.monotonic()
+
+        # (first_seq, path) for every segment on disk, oldest first
+        self._segments = self._list_segments()
+        self._last_seq = max(self._committed, self._scan_last_seq())
+
+        self._fh = None
+        self._fh_bytes = 0
+        _OPEN_WALS.add(self)
+
+    # ------------------------------------------------------------------
+    # Segment bookkeeping
+    # ------------------------------------------------------------------
+    def _acquire_lock(self):
+        """Take the exclusive lock on this WAL name, or raise if it's held."""
+        lock_path = os.path.join(self.wal_dir, f"{self.name}.lock")
+        lock_fh = open(lock_path, "a+", encoding="utf-8")
+        try:
+            fcntl.flock(lock_fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_fh.seek(0)
+            owner = lock_fh.read().strip() or "another process"
+            lock_fh.close()
+            raise RuntimeError(
+                f"WAL {self.name} in {self.wal_dir} is in use by {owner}; "
+                f"give this stream a different name"
+            )
+        lock_fh.seek(0)
+        lock_fh.truncate()
+        lock_fh.write(f"pid {os.getpid()}\n")
+        lock_fh.flush()
+        return lock_fh
+
+    def _segment_path(self, first_seq):
+        return os.path.join(self.wal_dir, f"{self.name}-{first_seq:020d}.wal")
+
+    def _list_segments(self):
+        prefix = f"{self.name}-"
+        segments = []
+        for fname in os.listdir(self.wal_dir):
+            if not (fname.startswith(prefix) and fname.endswith(".wal")):
+                continue
+            try:
+                first_seq = int(fname[len(prefix) : -len(".wal")])
+            except ValueError:
+                continue
+            segments.append((first_seq, os.path.join(self.wal_dir, fname)))
+        return sorted(segments)
+
+    def _scan_last_seq(self):
+        """Find the highest sequence number written to the newest segment."""
+        if not self._segments:
+            return 0
+        last_seq = self._segments[-1][0] - 1
+        for seq, _ in self._read_segment(self._segments[-1][1]):
+            last_seq = seq
+        return last_seq
+
+    def _read_checkpoint(self):
+        try:
+            with open(self._checkpoint_path, "r", encoding="utf-8") as fh:
+                return int(fh.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_checkpoint(self):
+        tmp_path = f"{self._checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            fh.write(str(self._committed))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self._checkpoint_path)
+        self._checkpointed = self._committed
+        self._last_checkpoint = time.monotonic()
+
+    @staticmethod
+    def _read_segment(path):
+        """Yield (seq, message) pairs, stopping at a torn trailing record."""
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring torn WAL record in {path}")
+                    break
+                yield record["seq"], record["msg"]
+
+    def _open_segment(self):
+        first_seq = self._last_seq + 1
+        path = self._segment_path(first_seq)
+        # A leftover segment starting here holds no readable records
+        self._segments = [seg for seg in self._segments if seg[0] != first_seq]
+        self._fh = open(path, "w", encoding="utf-8")
+        self._fh_bytes = 0
+        self._segments.append((first_seq, path))
+
+    def _truncate(self, include_active: bool = False):
+        """Delete segments whose records are all committed."""
+        while self._segments:
+            if len(self._segments) > 1:
+                segment_last_seq = self._segments[1][0] - 1
+            elif include_active:
+                segment_last_seq = self._last_seq
+            else:
+                break
+            if segment_last_seq > self._committed:
+                break
+            _, path = self._segments.pop(0)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def append(self, message) -> int:
+        """Write a message to the log and return its sequence number."""
+        if self._fh is None or self._fh_bytes >= self.segment_max_bytes:
+            if self._fh is not None:
+                self._fh.close()
+            self._open_segment()
+
+        self._last_seq += 1
+        line = json.dumps({"seq": self._last_seq, "msg": message}) + "\n"
+        self._fh.write(line)
+        self._fh.flush()  # Hand off to the OS so a killed process loses nothing
+        self._fh_bytes += len(line)
+
+        now = time.monotonic()
+        if self.fsync_policy == "always" or (
+            self.fsync_policy == "interval"
+            and now - self._last_fsync >= self.fsync_interval
+        ):
+            os.fsync(self._fh.fileno())
+            self._last_fsync = now
+
+        return self._last_seq
+
+    def commit(self, seq: int):
+        """Mark every record up to ``seq`` as persisted downstream."""
+        if seq <= self._committed:
+            return
+        self._committed = seq
+        if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            self._write_checkpoint()
+            self._truncate()
+
+    def has_pending(self) -> bool:
+        """Whether any written record has not been committed yet."""
+        return self._last_seq > self._committed
+
+    def pending(self):
+        """Yield (seq, message) for every record not yet committed."""
+        if self._fh is not None:
+            self._fh.flush()
+        for _, path in list(self._segments):
+            if not os.path.exists(path):
+                continue
+            for seq, message in self._read_segment(path):
+                if seq > self._committed:
+                    yield seq, message
+
+    def close(self):
+        """Flush, fsync and checkpoint the log."""
+        if self._fh is not None:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+            self._fh = None
+        if self._committed != self._checkpointed:
+            self._write_checkpoint()
+        self._truncate(include_active=True)
+        _OPEN_WALS.discard(self)
+        if self._lock_fh is not None:
+            # Closing the file releases the lock
+            self._lock_fh.close()
+            self._lock_fh = None
+
+
+def close_open_wals():
+    """Flush and checkpoint every WAL opened in this process."""
+    for wal in list(_OPEN_WALS):
+        try:
+            wal.close()
+        except Exception as e:
+            logger.error(f"Error closing WAL {wal.name}: {e}")
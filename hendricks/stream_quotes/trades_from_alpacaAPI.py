@@ -0,0 +1,104 @@
+"""
+Load historical trades from Alpaca API into a MongoDB collection.
+"""
+
+import logging
+from dotenv import load_dotenv
+from alpaca_trade_api import REST
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+load_dotenv()
+from quantum_trade_utilities.data.load_credentials import load_credentials
+from quantum_trade_utilities.data.mongo_conn import mongo_conn
+from quantum_trade_utilities.data.mongo_coll_verification import (
+    confirm_mongo_collect_exists,
+)
+from quantum_trade_utilities.core.get_path import get_path
+from quantum_trade_utilities.core.exceptions import APIError
+
+from hendricks.stream_quotes.stream_from_alpacaAPI import build_trade_document
+
+# Set up logging
+logging.basicConfig(level=logging.WARNING)  # Set to WARNING to suppress DEBUG messages
+logger = logging.getLogger("pymongo")
+logger.setLevel(logging.WARNING)  # Suppress pymongo debug messages
+
+
+def trades_from_alpacaAPI(
+    tickers=None,
+    collection_name="rawPriceColl",
+    creds_file_path=None,
+    from_date=None,
+    to_date=None,
+    feed="iex",
+    mongo_db="stocksDB",
+):
+    """
+    Load trades for a time window from Alpaca API into a MongoDB collection.
+
+    Documents match the ones written by the stream and are deduplicated by
+    trade_id, so the window may overlap trades the stream already stored.
+    """
+
+    if creds_file_path is None:
+        creds_file_path = get_path("creds")
+
+    # Load Alpaca API credentials from JSON file
+    API_KEY, API_SECRET, BASE_URL = load_credentials(
+        creds_file_path, "alpaca_paper_trade"
+    )
+
+    # Initialize the Alpaca API
+    api = REST(API_KEY, API_SECRET, BASE_URL, api_version="v2")
+
+    # Get the database connection
+    db = mongo_conn(mongo_db=mongo_db)
+
+    # Ensure the collection exists
+    confirm_mongo_collect_exists(collection_name, mongo_db)
+
+    # Get the collection
+    collection = db[collection_name]
+
+    # Index used to deduplicate trades
+    collection.create_index([("ticker", 1), ("trade_id", 1)])
+
+    inserted = 0
+    for ticker in tickers:
+        try:
+            trades = api.get_trades_iter(
+                ticker, start=from_date, end=to_date, feed=feed, raw=True
+            )
+            bulk_operations = []
+            for trade in trades:
+                # Single-symbol responses omit the symbol, so add it back
+                document = build_trade_document({**trade, "S": ticker})
+                bulk_operations.append(
+                    UpdateOne(
+                        {"ticker": ticker, "trade_id": document["trade_id"]},
+                        {"$setOnInsert": document},
+                        upsert=True,
+                    )
+                )
+        except Exception as e:
+            raise APIError(f"Error fetching trades from Alpaca API: {e}")
+
+        if not bulk_operations:
+            continue
+
+        try:
+            result = collection.bulk_write(bulk_operations, ordered=False)
+            inserted += result.upserted_count
+        except BulkWriteError as bwe:
+            # Filter out duplicate key errors (code 11000)
+            non_duplicate_errors = [
+                error for error in bwe.details["writeErrors"] if error["code"] != 11000
+            ]
+            if non_duplicate_errors:
+                logger.warning(
+                    f"Some writes failed for {ticker}: {non_duplicate_errors}"
+                )
+            inserted += bwe.details.get("nUpserted", 0)
+
+    return inserted